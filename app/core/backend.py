@@ -1,53 +1,196 @@
 # backend.py
+import time
+from itertools import islice
+from pathlib import Path
+
 import requests
-from PyQt5.QtCore import QObject, pyqtSignal
+from requests.adapters import HTTPAdapter
+from PyQt5.QtCore import QObject, pyqtSignal, pyqtSlot
+
+from core import jsonio
 
 # Ollama HTTP API base
 OLLAMA_BASE = "http://127.0.0.1:11434"
 API_URL = f"{OLLAMA_BASE}/api/chat"
 TAGS_URL = f"{OLLAMA_BASE}/api/tags"
 
+# Last successful /api/tags result, reused across quick restarts
+MODELS_CACHE_PATH = Path(__file__).resolve().parent.parent / "data" / "models_cache.json"
+MODELS_CACHE_TTL = 60  # seconds
+
+# Shared HTTP session: keeps the connection to Ollama alive between requests
+SESSION = requests.Session()
+SESSION.mount("http://", HTTPAdapter(pool_connections=4, pool_maxsize=8))
+
 # Generation limits (used for normal chat)
 MAX_TOKENS = 2048
 N_PREDICT = 2048
 
+# Prompt budget for the history sent each turn (rough estimate, see trim_history)
+MAX_CONTEXT_TOKENS = 6000
+ELIDED_MARKER = "[earlier messages elided]"
+# Old messages are dropped in steps of this many tokens (see trim_history)
+TRIM_STEP_TOKENS = MAX_CONTEXT_TOKENS // 4
+
+# History entries that are only shown in the chat (app notes, a sources block
+# without page content); never sent to the model
+NOTE_KINDS = frozenset(("note", "web_sources"))
+
+
+def _read_models_cache():
+    # $ Cached model list if it is younger than MODELS_CACHE_TTL, else None
+    try:
+        st = MODELS_CACHE_PATH.stat()
+        if time.time() - st.st_mtime >= MODELS_CACHE_TTL:
+            return None
+        models = jsonio.loads(MODELS_CACHE_PATH.read_bytes())
+    except Exception:
+        return None
+    if isinstance(models, list) and models:
+        return models
+    return None
+
 
 # Ask Ollama for all installed models via /api/tags (GET).
 # Returns a list of model names like: ['mistral:latest', 'llama3:8b', ...]
 def get_available_models():
+    cached = _read_models_cache()
+    if cached is not None:
+        return cached
+
     try:
-        r = requests.get(TAGS_URL, timeout=5)
+        r = SESSION.get(TAGS_URL, timeout=5)
         r.raise_for_status()
-        data = r.json()
+        data = jsonio.loads(r.content)
         models = [m.get("name") for m in data.get("models", []) if m.get("name")]
-        return models or ["llama3:latest"]
     except Exception as e:
         print("ERROR fetching models from Ollama:", e)
         return ["llama3:latest"]
 
+    if not models:
+        return ["llama3:latest"]
+
+    try:
+        MODELS_CACHE_PATH.write_bytes(jsonio.dumps(models, indent=False))
+    except Exception as e:
+        print("Error saving models cache:", e)
+    return models
+
+
+# Probed on first use, not at import, so a slow Ollama does not block startup
+_available_models = None
+
 
-AVAILABLE_MODELS = get_available_models()
-DEFAULT_MODEL_NAME = AVAILABLE_MODELS[0]
+def available_models():
+    global _available_models
+    if _available_models is None:
+        _available_models = get_available_models()
+    return _available_models
+
+
+def get_default_model_name():
+    return available_models()[0]
+
+
+def _estimate_tokens(text: str) -> int:
+    # Cheap heuristic: ~4 characters per token for English text
+    return len(text) // 4 + 1
+
+
+def trim_history(messages, max_tokens: int = MAX_CONTEXT_TOKENS, step: int = TRIM_STEP_TOKENS):
+    # $ Keep the first system prompt + the current turn (last user message onwards)
+    # + the earlier messages that fit in the budget. If anything is dropped,
+    # a short system marker says so.
+    # The cut advances in whole steps counted from the start of the chat, so it stays
+    # put for several turns: the sent prefix is then identical turn after turn and
+    # the backend can reuse its cached prompt state instead of re-evaluating it.
+    if not messages:
+        return messages
+
+    head = []
+    body = messages
+    if messages[0].get("role") == "system":
+        head = [messages[0]]
+        body = messages[1:]
+
+    last_user = len(body)
+    for i in range(len(body) - 1, -1, -1):
+        if body[i].get("role") == "user":
+            last_user = i
+            break
+
+    # The current turn is always sent, even when it alone exceeds the budget
+    tail = body[last_user:]
+    budget = max_tokens - sum(
+        _estimate_tokens(m.get("content") or "") for m in head + tail
+    )
+
+    costs = [_estimate_tokens(m.get("content") or "") for m in body[:last_user]]
+    excess = sum(costs) - budget
+    if excess <= 0:
+        return messages
+
+    # Drop a whole number of steps' worth of the oldest messages
+    step = max(1, step)
+    drop = -(-excess // step) * step
+    start = 0
+    dropped = 0
+    while start < last_user and dropped < drop:
+        dropped += costs[start]
+        start += 1
+
+    marker = {"role": "system", "content": ELIDED_MARKER}
+    return head + [marker] + body[start:]
 
 
 class Worker(QObject):
     # Background worker that sends the current chat history to Ollama
-    # and emits (reasoning, content) when done.
+    # and streams the reply back: token(piece) for each chunk as it arrives,
+    # then (reasoning, content) when done, both already stripped.
     # Reasoning is always empty here; only the main reply is used.
+    token = pyqtSignal(str)  # incremental content piece
     finished = pyqtSignal(str, str)  # (reasoning, content)
     error = pyqtSignal(str)
 
-    def __init__(self, history, model_name, parent=None):
+    def __init__(
+        self,
+        history,
+        model_name,
+        parent=None,
+        max_context_tokens: int = MAX_CONTEXT_TOKENS,
+    ):
         super().__init__(parent)
+        self.max_context_tokens = max_context_tokens
+        # Reply being streamed, so cancel() can close it
+        self._response = None
+        self.set_job(history, model_name)
+
+    def set_job(self, history, model_name) -> None:
+        # $ Input of the next run(); a worker is reused across replies.
+        # history is the chat's own list, not a copy: it is append-only, so the
+        # first history_len messages stay exactly what was sent for.
         self.history = history or []
-        self.model_name = model_name or DEFAULT_MODEL_NAME
+        self.history_len = len(self.history)
+        self.model_name = model_name or get_default_model_name()
+        self._cancelled = False
 
-    # Perform the blocking HTTP request to Ollama and emit signals when done.
+    def cancel(self) -> None:
+        # $ Called from the UI thread (app closing): run() stops at its next line,
+        # and closing the response wakes it if it is waiting for one
+        self._cancelled = True
+        response = self._response
+        if response is not None:
+            response.close()
+
+    # Stream the reply from Ollama (NDJSON, one chunk per line) and emit signals.
+    @pyqtSlot()
     def run(self):
         try:
             # Normalize history into Ollama message format
             messages = []
-            for item in self.history:
+            for item in islice(self.history, self.history_len):
+                if item.get("kind") in NOTE_KINDS:
+                    continue
                 role = item.get("role", "user")
                 content = item.get("content", "")
 
@@ -61,10 +204,13 @@ class Worker(QObject):
                     }
                 )
 
+            # Bounded payload no matter how long the chat gets
+            messages = trim_history(messages, self.max_context_tokens)
+
             payload = {
                 "model": self.model_name,
                 "messages": messages,
-                "stream": False,
+                "stream": True,
                 "think": False,
                 "options": {
                     "num_predict": N_PREDICT,
@@ -74,15 +220,39 @@ class Worker(QObject):
                 },
             }
 
-            r = requests.post(API_URL, json=payload, timeout=600)
-            r.raise_for_status()
-            data = r.json()
+            # (connect, read) timeout: the read timeout applies per chunk
+            pieces = []
+            if self._cancelled:
+                return
+            with SESSION.post(API_URL, json=payload, stream=True, timeout=(5, 600)) as r:
+                self._response = r
+                if self._cancelled:
+                    return
+                r.raise_for_status()
+                for line in r.iter_lines():
+                    if self._cancelled:
+                        return
+                    if not line:
+                        continue
+                    chunk = jsonio.loads(line)
+                    if chunk.get("error"):
+                        raise RuntimeError(chunk["error"])
+
+                    piece = (chunk.get("message") or {}).get("content") or ""
+                    if piece:
+                        pieces.append(piece)
+                        self.token.emit(piece)
+
+                    if chunk.get("done"):
+                        break
 
-            msg = data.get("message") or {}
-            content = (msg.get("content") or "").strip()
+            content = "".join(pieces).strip()
 
             reasoning = ""
             self.finished.emit(reasoning, content)
 
         except Exception as e:
-            self.error.emit(str(e))
+            if not self._cancelled:
+                self.error.emit(str(e))
+        finally:
+            self._response = None
@@ -1,10 +1,14 @@
 # core/chat_state.py
-import json
+import os
+import re
+import uuid
 from pathlib import Path
 
-from .backend import DEFAULT_MODEL_NAME
-from .settings import get_system_prompt
+from PyQt5.QtCore import QRunnable, QThreadPool, QTimer
 
+from . import jsonio
+from .backend import get_default_model_name
+from .settings import get_system_prompt
 
 
 # app/ directory
@@ -12,41 +16,66 @@ BASE_DIR = Path(__file__).resolve().parent.parent
 
 # app/data/
 DATA_DIR = BASE_DIR / "data"
+
+# app/data/chats/: index.json (order + current index) and one <chat_id>.json per chat
+CHATS_DIR = DATA_DIR / "chats"
+CHATS_INDEX_PATH = CHATS_DIR / "index.json"
+
+# Old single-file format; read once and migrated on the next save
 CHAT_SAVE_PATH = DATA_DIR / "chats.json"
 
+# Coalesce rapid chat changes into one background write
+SAVE_DEBOUNCE_MS = 500
+
+# "Result N: <title>" directly followed by "URL: <url>" (see web_search.py)
+_WEB_RESULT_RE = re.compile(
+    r"^[ \t]*Result [^\n]*?: [ \t]*(?P<title>[^\n]*?\S)[ \t]*\n"
+    r"[ \t]*URL: [ \t]*(?P<url>\S+)",
+    re.MULTILINE,
+)
+
 
 def make_new_chat(title: str, model_name: str = None) -> dict:
     # $ Create a new chat dict with a chosen model
-    model = (model_name or DEFAULT_MODEL_NAME).strip()
-    if not model:
-        model = DEFAULT_MODEL_NAME
+    model = (model_name or "").strip() or get_default_model_name()
 
     return {
+        "id": _new_chat_id(),
         "title": title,
         "model": model,
         "history": [
             {"role": "system", "content": get_system_prompt()},
         ],
-        "html": "",
+        # Rendered message fragments (see HttpLLMChatWindow._chat_html)
+        "html": [],
     }
 
 
-def _shrink_web_results(content: str) -> str:
+def _new_chat_id() -> str:
+    return uuid.uuid4().hex
+
+
+def _chat_path(chat_id: str) -> Path:
+    return CHATS_DIR / f"{chat_id}.json"
+
+
+def _chat_stamp(chat: dict):
+    # $ Cheap change marker: "rev" counts history appends (bumped by the window's
+    # _append_history, not saved), so it + title/model tell whether the chat
+    # differs from what was last written.
+    return (chat.get("title"), chat.get("model"), chat.get("rev", 0))
+
+
+# chat_id -> stamp of the version already on disk
+_saved_stamps = {}
+
+
+def shrink_web_results(content: str) -> str:
     # $ Take the huge web_results blob and keep only title+URL pairs as markdown links.
-    lines = (content or "").splitlines()
-    links = []
-
-    current_title = None
-    for line in lines:
-        line = line.strip()
-        if line.startswith("Result ") and ": " in line:
-            # e.g. "Result 1: 200 Best Dad Jokes..."
-            current_title = line.split(": ", 1)[1].strip()
-        elif line.startswith("URL: ") and current_title:
-            url = line[5:].strip()
-            if url:
-                links.append(f"- [{current_title}]({url})")
-            current_title = None
+    links = [
+        f"- [{m.group('title')}]({m.group('url')})"
+        for m in _WEB_RESULT_RE.finditer(content or "")
+    ]
 
     if not links:
         return "Web search sources: (none)"
@@ -54,69 +83,207 @@ def _shrink_web_results(content: str) -> str:
     return "Web search sources:\n\n" + "\n".join(links)
 
 
+def _snapshot_chats(chats: list, current_index: int) -> dict:
+    # $ Build the data to persist: the index plus only the chats that changed
+    # since the last save, with web_results compressed to links-only.
+    # New lists are built per chat, so the result is safe to hand to another thread.
+    order = []
+    changed = {}
+    for chat in chats:
+        chat_id = chat.setdefault("id", _new_chat_id())
+        order.append(chat_id)
+
+        stamp = _chat_stamp(chat)
+        if _saved_stamps.get(chat_id) == stamp:
+            continue
+        _saved_stamps[chat_id] = stamp
+
+        raw_history = chat.get("history", [])
+
+        # $ Message dicts are never mutated after being appended, so only the
+        # web_results ones get a new dict; everything else is shared as-is.
+        new_history = [
+            {
+                **msg,
+                # $ compress this giant blob to only hyperlinks
+                "content": shrink_web_results(msg.get("content") or ""),
+                "kind": "web_links",
+            }
+            if msg.get("kind") == "web_results"
+            else msg
+            for msg in raw_history
+        ]
+
+        changed[chat_id] = {
+            "title": chat.get("title", ""),
+            "model": chat.get("model", get_default_model_name()),
+            "history": new_history,
+        }
+
+    # $ Chats saved or loaded before but gone now were deleted by the user.
+    # Files that failed to load were never stamped, so they are never listed here.
+    current = set(order)
+    removed = [chat_id for chat_id in _saved_stamps if chat_id not in current]
+    for chat_id in removed:
+        del _saved_stamps[chat_id]
+
+    return {
+        "index": {"current_index": current_index, "order": order},
+        "chats": changed,
+        "removed": removed,
+    }
+
+
+def _write_atomic(path: Path, data) -> None:
+    # $ Write to a temp file and swap it in, so a crash never leaves half a file
+    tmp_path = path.with_suffix(".tmp")
+    tmp_path.write_bytes(jsonio.dumps(data))
+    os.replace(tmp_path, path)
+
+
+def _write_snapshot(data: dict) -> None:
+    try:
+        CHATS_DIR.mkdir(parents=True, exist_ok=True)
+
+        for chat_id, chat in data["chats"].items():
+            _write_atomic(_chat_path(chat_id), chat)
+        _write_atomic(CHATS_INDEX_PATH, data["index"])
+
+        # $ Drop files of deleted chats
+        for chat_id in data["removed"]:
+            try:
+                os.remove(_chat_path(chat_id))
+            except FileNotFoundError:
+                pass
+    except Exception as e:
+        # Forget what is on disk so the next save rewrites every chat
+        _saved_stamps.clear()
+        print("Error saving chats:", e)
+
+
 def save_chats(chats: list, current_index: int) -> None:
-    # $ Save chats + current index, compressing web_results to links-only
+    # $ Save changed chats + index synchronously (used on exit)
     try:
-        DATA_DIR.mkdir(parents=True, exist_ok=True)
-
-        clean_chats = []
-        for chat in chats:
-            raw_history = chat.get("history", [])
-            new_history = []
-
-            for msg in raw_history:
-                kind = (msg.get("kind") or "").strip()
-                if kind == "web_results":
-                    # $ compress this giant blob to only hyperlinks
-                    content = msg.get("content") or ""
-                    msg = msg.copy()
-                    msg["content"] = _shrink_web_results(content)
-                    # optionally re-label
-                    msg["kind"] = "web_links"
-
-                new_history.append(msg)
-
-            clean_chats.append({
-                "title": chat.get("title", ""),
-                "model": chat.get("model", DEFAULT_MODEL_NAME),
-                "history": new_history,
-            })
-
-        data = {
-            "chats": clean_chats,
-            "current_index": current_index,
-        }
+        data = _snapshot_chats(chats, current_index)
+    except Exception as e:
+        print("Error saving chats:", e)
+        return
+    _write_snapshot(data)
+
+
+class _SaveTask(QRunnable):
+    def __init__(self, data: dict):
+        super().__init__()
+        self.data = data
+
+    def run(self):
+        _write_snapshot(self.data)
 
-        CHAT_SAVE_PATH.write_text(
-            json.dumps(data, ensure_ascii=False, indent=2),
-            encoding="utf-8",
-        )
+
+_save_pool = None
+_save_timer = None
+_pending_save = None
+
+
+def _get_save_pool() -> QThreadPool:
+    global _save_pool
+    if _save_pool is None:
+        _save_pool = QThreadPool()
+        # One writer thread: saves hit the disk in the order they were made.
+        # It is kept even when idle, instead of being restarted for each save.
+        _save_pool.setMaxThreadCount(1)
+        _save_pool.setExpiryTimeout(-1)
+    return _save_pool
+
+
+def _flush_pending_save() -> None:
+    global _pending_save
+    if _pending_save is None:
+        return
+    chats, current_index = _pending_save
+    _pending_save = None
+
+    try:
+        data = _snapshot_chats(chats, current_index)
     except Exception as e:
         print("Error saving chats:", e)
+        return
+    _get_save_pool().start(_SaveTask(data))
 
 
+def schedule_save(chats: list, current_index: int) -> None:
+    # $ Debounced background save: bursts of changes within SAVE_DEBOUNCE_MS
+    # become one write. Must be called from the UI thread.
+    global _save_timer, _pending_save
+    _pending_save = (chats, current_index)
+
+    if _save_timer is None:
+        _save_timer = QTimer()
+        _save_timer.setSingleShot(True)
+        _save_timer.timeout.connect(_flush_pending_save)
+    _save_timer.start(SAVE_DEBOUNCE_MS)
+
+
+def flush_saves(chats: list, current_index: int) -> None:
+    # $ Final save (before exit): skips the debounce, queues the write behind any
+    # running one on the writer thread and waits for both
+    global _pending_save
+    _pending_save = (chats, current_index)
+    if _save_timer is not None:
+        _save_timer.stop()
+    _flush_pending_save()
+    _get_save_pool().waitForDone()
+
+
+def _load_legacy_chats():
+    # $ Old single chats.json; its chats get ids and are written out on the next save
+    raw = CHAT_SAVE_PATH.read_bytes()
+    data = jsonio.loads(raw)
+    chats = data.get("chats", [])
+    current_index = data.get("current_index", 0)
+
+    # $ one-time cleanup: drop old web_results messages
+    for chat in chats:
+        hist = chat.get("history", [])
+        chat["history"] = [
+            m for m in hist
+            if m.get("kind") != "web_results"
+        ]
+        chat["id"] = _new_chat_id()
+
+    return chats, current_index
 
-def load_chats():
-    if not CHAT_SAVE_PATH.exists():
-        return None
 
+def _load_chat_files():
+    index = jsonio.loads(CHATS_INDEX_PATH.read_bytes())
+    current_index = index.get("current_index", 0)
+
+    chats = []
+    for chat_id in index.get("order", []):
+        try:
+            chat = jsonio.loads(_chat_path(chat_id).read_bytes())
+        except Exception as e:
+            print(f"Error loading chat {chat_id}:", e)
+            continue
+        chat["id"] = chat_id
+        _saved_stamps[chat_id] = _chat_stamp(chat)
+        chats.append(chat)
+
+    return chats, current_index
+
+
+def load_chats():
     try:
-        raw = CHAT_SAVE_PATH.read_text(encoding="utf-8")
-        data = json.loads(raw)
-        chats = data.get("chats", [])
-        current_index = data.get("current_index", 0)
+        if CHATS_INDEX_PATH.exists():
+            chats, current_index = _load_chat_files()
+        elif CHAT_SAVE_PATH.exists():
+            chats, current_index = _load_legacy_chats()
+        else:
+            return None
 
         if not chats:
             return None
 
-        # $ one-time cleanup: drop old web_results messages
-        for chat in chats:
-            hist = chat.get("history", [])
-            chat["history"] = [
-                m for m in hist
-                if (m.get("kind") or "") != "web_results"
-            ]
-
         current_index = max(0, min(current_index, len(chats) - 1))
         return chats, current_index
     except Exception as e:
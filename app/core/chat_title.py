@@ -1,10 +1,14 @@
 # core/chat_title.py
 
 from typing import List, Dict, Any
-import requests
-from core.backend import API_URL, DEFAULT_MODEL_NAME
+from core import jsonio
+from core.backend import API_URL, get_default_model_name, SESSION
 from core.settings import get_title_planner_prompt
 
+# Only the head of the first message goes into the title prompt: the title needs
+# the gist, and a pasted document would otherwise be prompt-evaluated in full
+TITLE_INPUT_CHARS = 2000
+
 
 def _get_first_user_message(history: List[Dict[str, Any]]) -> str:
     # Return the first non-empty user message from the history.
@@ -14,9 +18,9 @@ def _get_first_user_message(history: List[Dict[str, Any]]) -> str:
         role = (msg.get("role") or "").lower()
         if role != "user":
             continue
-        content = (msg.get("content") or "").strip()
-        if content:
-            return content
+        content = msg.get("content")
+        if content and not content.isspace():
+            return content.lstrip()[:TITLE_INPUT_CHARS].rstrip()
     return ""
 
 
@@ -24,7 +28,8 @@ def _fallback_title(first_msg: str) -> str:
     # Very simple fallback: use the first user message, first line only, truncated.
     if not first_msg:
         return "New chat"
-    text = first_msg.strip().splitlines()[0]
+    # First line only, without splitting the whole message into a list
+    text = first_msg.strip().partition("\n")[0].rstrip()
     if len(text) > 80:
         text = text[:80].rstrip()
     return text or "New chat"
@@ -74,7 +79,7 @@ def build_chat_title(conversation_history, model_name: str | None = None) -> str
     if not first_msg:
         return ""
 
-    planner_model = (model_name or DEFAULT_MODEL_NAME).strip() or DEFAULT_MODEL_NAME
+    planner_model = (model_name or "").strip() or get_default_model_name()
 
     template = get_title_planner_prompt()
     user_prompt = template.format(
@@ -102,17 +107,17 @@ def build_chat_title(conversation_history, model_name: str | None = None) -> str
     }
 
     try:
-        r = requests.post(API_URL, json=payload, timeout=15)
+        r = SESSION.post(API_URL, json=payload, timeout=15)
         r.raise_for_status()
-        data = r.json()
+        data = jsonio.loads(r.content)
     except Exception as e:
         print(f"[title_planner] ERROR request failed: {e}")
         return _fallback_title(first_msg)
 
-    raw_content = _extract_content_from_response(data).strip()
+    raw_content = _extract_content_from_response(data)
     print("[title_planner] RAW OUTPUT:", repr(raw_content))
 
-    if not raw_content:
+    if not raw_content or raw_content.isspace():
         return _fallback_title(first_msg)
 
     # Very light post-processing: single line, trimmed, without wrapping quotes
@@ -0,0 +1,32 @@
+# core/jsonio.py
+import json
+
+# orjson is optional: it is much faster for the chats/settings files,
+# but the app keeps working with the stdlib json module.
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def loads(raw):
+    # $ Parse JSON from bytes or str (orjson reads UTF-8 bytes directly)
+    if orjson is not None:
+        return orjson.loads(raw)
+    if isinstance(raw, (bytes, bytearray)):
+        raw = raw.decode("utf-8")
+    return json.loads(raw)
+
+
+def dumps(obj, indent: bool = True) -> bytes:
+    # $ Serialize to UTF-8 bytes (non-ASCII kept as-is, 2-space indent by default)
+    if orjson is not None:
+        option = orjson.OPT_NON_STR_KEYS
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(obj, option=option)
+    return json.dumps(
+        obj,
+        ensure_ascii=False,
+        indent=2 if indent else None,
+    ).encode("utf-8")
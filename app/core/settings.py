@@ -1,7 +1,10 @@
 # core/settings.py
-import json
+import copy
 from pathlib import Path
-from core.backend import DEFAULT_MODEL_NAME  # adjust import if needed
+from types import MappingProxyType
+
+from core import jsonio
+from core.backend import get_default_model_name  # adjust import if needed
 
 BASE_DIR = Path(__file__).resolve().parent.parent
 SETTINGS_PATH = BASE_DIR / "data" / "settings.json"
@@ -9,111 +12,118 @@ THEME_PRESETS_PATH = BASE_DIR / "data" / "theme_presets.json"
 PROMPTS_PATH = BASE_DIR / "data" / "prompts.json"
 
 
-def load_default_model():
-    try:
-        raw = SETTINGS_PATH.read_text(encoding="utf-8")
-        data = json.loads(raw)
-        model = (data.get("default_model") or "").strip()
-        return model or DEFAULT_MODEL_NAME
-    except Exception:
-        return DEFAULT_MODEL_NAME
+# $ Parsed JSON files: path -> ((mtime_ns, size), data). Re-read only when the file changes.
+_JSON_CACHE = {}
 
-def save_default_model(model_name: str):
-    model_name = (model_name or "").strip()
-    if not model_name:
-        return
 
-    data = {}
+def _read_json_cached(path: Path):
+    # $ Return the parsed file (shared object, do not mutate) or None if it is missing
     try:
-        if SETTINGS_PATH.exists():
-            raw = SETTINGS_PATH.read_text(encoding="utf-8")
-            data = json.loads(raw)
-    except Exception:
-        data = {}
+        st = path.stat()
+    except FileNotFoundError:
+        _JSON_CACHE.pop(path, None)
+        return None
+
+    stamp = (st.st_mtime_ns, st.st_size)
+    cached = _JSON_CACHE.get(path)
+    if cached is not None and cached[0] == stamp:
+        return cached[1]
+
+    data = jsonio.loads(path.read_bytes())
+    _JSON_CACHE[path] = (stamp, data)
+    return data
+
+
+def _write_json(path: Path, data) -> None:
+    path.write_bytes(jsonio.dumps(data))
+    _JSON_CACHE.pop(path, None)
 
-    data["default_model"] = model_name
 
+def _read_settings() -> dict:
+    # $ Cached settings.json for read-only callers
     try:
-        SETTINGS_PATH.write_text(
-            json.dumps(data, ensure_ascii=False, indent=2),
-            encoding="utf-8",
-        )
+        data = _read_json_cached(SETTINGS_PATH)
     except Exception as e:
-        print("Error saving settings:", e)
+        print("Error loading settings:", e)
+        return {}
+    return data if isinstance(data, dict) else {}
 
-def load_theme() -> dict:
-    # $ Merge DEFAULT_THEME with optional overrides from settings.json["theme"]
-    theme = DEFAULT_THEME.copy()
 
+def _read_prompts() -> dict:
+    # $ Cached prompts.json for read-only callers
     try:
-        if SETTINGS_PATH.exists():
-            raw = SETTINGS_PATH.read_text(encoding="utf-8")
-            data = json.loads(raw)
-            overrides = data.get("theme") or {}
-            if isinstance(overrides, dict):
-                theme.update(overrides)
+        data = _read_json_cached(PROMPTS_PATH)
     except Exception as e:
-        print("Error loading theme:", e)
+        print("Error loading prompts:", e)
+        return {}
+    return data if isinstance(data, dict) else {}
+
+
+def load_default_model():
+    model = (_read_settings().get("default_model") or "").strip()
+    return model or get_default_model_name()
+
+def save_default_model(model_name: str):
+    model_name = (model_name or "").strip()
+    if not model_name:
+        return
+
+    data = load_settings_dict()
+    data["default_model"] = model_name
+    save_settings_dict(data)
+
+# $ Merged theme, rebuilt only when settings.json["theme"] changes
+_THEME_CACHE = {"source": None, "merged": None}
 
-    return theme
+
+def load_theme():
+    # $ DEFAULT_THEME overlaid with settings.json["theme"], as a shared read-only mapping
+    overrides = _read_settings().get("theme")
+    if _THEME_CACHE["merged"] is not None and overrides is _THEME_CACHE["source"]:
+        return _THEME_CACHE["merged"]
+
+    merged = DEFAULT_THEME.copy()
+    if isinstance(overrides, dict):
+        merged.update(overrides)
+
+    _THEME_CACHE["source"] = overrides
+    _THEME_CACHE["merged"] = MappingProxyType(merged)
+    return _THEME_CACHE["merged"]
 
 def load_theme_presets() -> dict:
     try:
-        if THEME_PRESETS_PATH.exists():
-            raw = THEME_PRESETS_PATH.read_text(encoding="utf-8")
-            data = json.loads(raw)
-            if isinstance(data, dict):
-                return data
+        data = _read_json_cached(THEME_PRESETS_PATH)
+        if isinstance(data, dict):
+            return copy.deepcopy(data)
     except Exception as e:
         print("Error loading theme presets:", e)
     return {}
 
 def load_settings_dict() -> dict:
-    try:
-        if SETTINGS_PATH.exists():
-            raw = SETTINGS_PATH.read_text(encoding="utf-8")
-            return json.loads(raw)
-    except Exception as e:
-        print("Error loading settings:", e)
-    return {}
+    # $ Deep copy of the cached file, so callers can edit it freely before saving
+    return copy.deepcopy(_read_settings())
 
 def save_settings_dict(data: dict) -> None:
     try:
-        SETTINGS_PATH.write_text(
-            json.dumps(data, indent=2, ensure_ascii=False),
-            encoding="utf-8",
-        )
+        _write_json(SETTINGS_PATH, data)
     except Exception as e:
         print("Error saving settings:", e)
 
 def load_prompts_dict() -> dict:
-    if not PROMPTS_PATH.exists():
-        return {}
-    try:
-        raw = PROMPTS_PATH.read_text(encoding="utf-8")
-        data = json.loads(raw)
-        return data if isinstance(data, dict) else {}
-    except Exception as e:
-        print("Error loading prompts:", e)
-        return {}
+    return copy.deepcopy(_read_prompts())
 
 def save_prompts_dict(overrides: dict) -> None:
     try:
         PROMPTS_PATH.parent.mkdir(parents=True, exist_ok=True)
-        PROMPTS_PATH.write_text(
-            json.dumps(overrides, indent=2, ensure_ascii=False),
-            encoding="utf-8",
-        )
+        _write_json(PROMPTS_PATH, overrides)
     except Exception as e:
         print("Error saving prompts:", e)
 
 def get_prompt(key: str) -> str:
-    prompts = DEFAULT_PROMPTS.copy()
-    overrides = load_prompts_dict()
-    for k, v in overrides.items():
-        if isinstance(v, str):
-            prompts[k] = v
-    return prompts.get(key, "")
+    value = _read_prompts().get(key)
+    if isinstance(value, str):
+        return value
+    return DEFAULT_PROMPTS.get(key, "")
 
 def get_system_prompt() -> str:
     return get_prompt("system")
@@ -124,18 +134,24 @@ def get_search_planner_prompt() -> str:
 def get_web_followup_instruction() -> str:
     return get_prompt("web_followup")
 
+# $ Merged web_search settings, rebuilt only when settings.json["web_search"] changes
+_WEB_SETTINGS_CACHE = {"source": None, "merged": None}
+
+
 def load_web_settings() -> dict:
     """Return merged web_search settings: defaults overlaid with settings.json."""
-    data = load_settings_dict()
-    raw = data.get("web_search")
-    if not isinstance(raw, dict):
-        raw = {}
-
-    merged = DEFAULT_WEB_SEARCH_SETTINGS.copy()
-    for k, v in raw.items():
-        if k in merged:
-            merged[k] = v
-    return merged
+    raw = _read_settings().get("web_search")
+    if _WEB_SETTINGS_CACHE["merged"] is None or raw is not _WEB_SETTINGS_CACHE["source"]:
+        merged = DEFAULT_WEB_SEARCH_SETTINGS.copy()
+        if isinstance(raw, dict):
+            for k, v in raw.items():
+                if k in merged:
+                    merged[k] = v
+        _WEB_SETTINGS_CACHE["source"] = raw
+        _WEB_SETTINGS_CACHE["merged"] = merged
+
+    # Values are scalars: a shallow copy keeps the cache safe from callers
+    return dict(_WEB_SETTINGS_CACHE["merged"])
 
 def save_web_settings(settings: dict) -> None:
     """Write web_search settings back into settings.json."""
@@ -151,12 +167,16 @@ def get_title_planner_prompt() -> str:
     return get_prompt("title_planner")
 
 def is_title_planner_enabled() -> bool:
-    data = load_settings_dict()
+    data = _read_settings()
     val = data.get("auto_title_planner")
     if val is None:
         return True  # default ON
     return bool(val)
 
+def is_reply_cache_enabled() -> bool:
+    # Replies are sampled (temperature > 0), so reusing them is opt-in
+    return bool(_read_settings().get("reply_cache", False))
+
 DEFAULT_PROMPTS = {
     "system": (
         "use the $...$ for equastions. there cannot be any space between the "
@@ -0,0 +1,100 @@
+// Page side of ui/chat_bridge.py: applies the bridge's signals to the DOM
+(function () {
+  if (!window.qt || !window.QWebChannel) {
+    return;
+  }
+
+  function scrollDown() {
+    window.scrollTo(0, document.body.scrollHeight);
+  }
+
+  // MathJax only typesets the page once on load; inserted HTML is typeset here
+  function typeset(el) {
+    if (el && window.MathJax && MathJax.typesetPromise) {
+      MathJax.typesetPromise([el]).catch(function () {});
+    }
+  }
+
+  // Drops MathJax's records of math inside el before el is removed or replaced
+  function untypeset(el) {
+    if (el && window.MathJax && MathJax.typesetClear) {
+      MathJax.typesetClear([el]);
+    }
+  }
+
+  // Appends html at the end of el and typesets only the new elements
+  function appendTypeset(el, html) {
+    var count = el.children.length;
+    el.insertAdjacentHTML('beforeend', html);
+    var added = Array.prototype.slice.call(el.children, count);
+    if (added.length && window.MathJax && MathJax.typesetPromise) {
+      MathJax.typesetPromise(added).catch(function () {});
+    }
+  }
+
+  new QWebChannel(qt.webChannelTransport, function (channel) {
+    var bridge = channel.objects.bridge;
+    var chat = document.getElementById('chat');
+
+    bridge.append_html.connect(function (html) {
+      var anchor = document.getElementById('search-progress')
+        || document.getElementById('msg-streaming');
+      if (anchor) {
+        anchor.insertAdjacentHTML('beforebegin', html);
+        typeset(anchor.previousElementSibling);
+      } else if (chat) {
+        chat.insertAdjacentHTML('beforeend', html);
+        typeset(chat.lastElementChild);
+      }
+      scrollDown();
+    });
+
+    bridge.insert_block.connect(function (id, html) {
+      if (chat && !document.getElementById(id)) {
+        appendTypeset(chat, html);
+        scrollDown();
+      }
+    });
+
+    bridge.append_into.connect(function (id, html) {
+      var el = document.getElementById(id);
+      if (el) {
+        appendTypeset(el, html);
+        scrollDown();
+      }
+    });
+
+    bridge.stream_update.connect(function (stableHtml, tailHtml) {
+      var done = document.getElementById('msg-streaming-done');
+      var tail = document.getElementById('msg-streaming-tail');
+      if (done && tail) {
+        // Only finished blocks are typeset; the tail changes every frame and
+        // arrives typeset as part of the final message
+        if (stableHtml) { appendTypeset(done, stableHtml); }
+        tail.innerHTML = tailHtml;
+        scrollDown();
+      }
+    });
+
+    bridge.remove_element.connect(function (id) {
+      var el = document.getElementById(id);
+      if (el) {
+        untypeset(el);
+        el.remove();
+      }
+    });
+
+    bridge.reset_chat.connect(function (html) {
+      if (chat) {
+        untypeset(chat);
+        chat.innerHTML = html;
+        typeset(chat);
+      }
+      scrollDown();
+    });
+
+    bridge.scroll_to_bottom.connect(scrollDown);
+
+    bridge.page_ready();
+  });
+})();
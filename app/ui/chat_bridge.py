@@ -0,0 +1,30 @@
+# ui/chat_bridge.py
+from PyQt5.QtCore import QObject, pyqtSignal, pyqtSlot
+
+
+class ChatBridge(QObject):
+    """Object shared with the chat page over QWebChannel (as "bridge").
+
+    Python emits the signals below with HTML fragments; ui/chat_bridge.js applies
+    them to the DOM. No JS source is built or re-parsed per update.
+    """
+
+    # $ Message HTML, inserted above any in-progress block (search progress, streaming reply)
+    append_html = pyqtSignal(str)
+    # $ element id, HTML: appended to #chat unless an element with that id exists
+    insert_block = pyqtSignal(str, str)
+    # $ element id, HTML: appended inside that element
+    append_into = pyqtSignal(str, str)
+    # $ Streaming reply: HTML of newly finished blocks, HTML of the current tail
+    stream_update = pyqtSignal(str, str)
+    remove_element = pyqtSignal(str)
+    # $ Whole chat content (chat switch): replaces #chat, the page itself is kept
+    reset_chat = pyqtSignal(str)
+    scroll_to_bottom = pyqtSignal()
+
+    # $ Emitted once the page has connected to the signals above
+    ready = pyqtSignal()
+
+    @pyqtSlot()
+    def page_ready(self):
+        self.ready.emit()
@@ -0,0 +1,111 @@
+# ui/chat_list.py
+from PyQt5.QtCore import Qt, QAbstractListModel, QEvent, QModelIndex, QRect, pyqtSignal
+from PyQt5.QtGui import QPalette
+from PyQt5.QtWidgets import QStyle, QStyledItemDelegate, QStyleOptionViewItem
+
+# Delete glyph drawn on the hovered row
+CLOSE_GLYPH = "✕"
+CLOSE_MARGIN = 6
+
+
+class ChatListModel(QAbstractListModel):
+    """Sidebar rows over the window's chat list (shared, not copied).
+
+    Chats are added / removed through the model so the view is told before the list changes.
+    """
+
+    def __init__(self, chats, parent=None):
+        super().__init__(parent)
+        self._chats = chats
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._chats)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if role != Qt.DisplayRole or not index.isValid():
+            return None
+        row = index.row()
+        if row >= len(self._chats):
+            return None
+        return self._chats[row].get("title", "Untitled")
+
+    def set_chats(self, chats) -> None:
+        self.beginResetModel()
+        self._chats = chats
+        self.endResetModel()
+
+    def append_chat(self, chat) -> None:
+        row = len(self._chats)
+        self.beginInsertRows(QModelIndex(), row, row)
+        self._chats.append(chat)
+        self.endInsertRows()
+
+    def remove_chat(self, row: int):
+        self.beginRemoveRows(QModelIndex(), row, row)
+        chat = self._chats.pop(row)
+        self.endRemoveRows()
+        return chat
+
+    def row_of(self, chat) -> int:
+        # $ Row of this chat dict (by identity), -1 if it is gone
+        for row, c in enumerate(self._chats):
+            if c is chat:
+                return row
+        return -1
+
+    def title_changed(self, row: int) -> None:
+        index = self.index(row)
+        if index.isValid():
+            self.dataChanged.emit(index, index, [Qt.DisplayRole])
+
+
+class ChatListDelegate(QStyledItemDelegate):
+    """Paints a row's title plus, on hover, a delete glyph; no per-row widgets."""
+
+    # $ Row whose glyph was clicked
+    delete_requested = pyqtSignal(int)
+
+    def _close_rect(self, option) -> QRect:
+        side = option.fontMetrics.height()
+        rect = option.rect
+        return QRect(
+            rect.right() - CLOSE_MARGIN - side + 1,
+            rect.top() + (rect.height() - side) // 2,
+            side,
+            side,
+        )
+
+    def paint(self, painter, option, index):
+        if not option.state & QStyle.State_MouseOver:
+            super().paint(painter, option, index)
+            return
+
+        opt = QStyleOptionViewItem(option)
+        self.initStyleOption(opt, index)
+        close_rect = self._close_rect(opt)
+
+        # Keep the title clear of the glyph
+        style = opt.widget.style() if opt.widget is not None else None
+        if style is not None:
+            text_rect = style.subElementRect(QStyle.SE_ItemViewItemText, opt, opt.widget)
+            width = close_rect.left() - CLOSE_MARGIN - text_rect.left()
+            opt.text = opt.fontMetrics.elidedText(opt.text, Qt.ElideRight, max(0, width))
+            style.drawControl(QStyle.CE_ItemViewItem, opt, painter, opt.widget)
+        else:
+            super().paint(painter, option, index)
+
+        painter.save()
+        selected = opt.state & QStyle.State_Selected
+        painter.setPen(opt.palette.color(QPalette.HighlightedText if selected else QPalette.Text))
+        painter.setFont(opt.font)
+        painter.drawText(close_rect, Qt.AlignCenter, CLOSE_GLYPH)
+        painter.restore()
+
+    def editorEvent(self, event, model, option, index):
+        # Press and release on the glyph are both taken, so the row is not selected first
+        if event.type() in (QEvent.MouseButtonPress, QEvent.MouseButtonRelease):
+            if event.button() == Qt.LeftButton and self._close_rect(option).contains(event.pos()):
+                if event.type() == QEvent.MouseButtonRelease:
+                    self.delete_requested.emit(index.row())
+                return True
+        return super().editorEvent(event, model, option, index)
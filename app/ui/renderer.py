@@ -1,41 +1,90 @@
 # ui/renderer.py
-import markdown
+import re
+from html import escape as _html_escape
 from pathlib import Path
 
+from core.chat_state import shrink_web_results
 from core.settings import load_theme  # new
 
 BASE_DIR = Path(__file__).resolve().parent
 TEMPLATE_PATH = BASE_DIR / "chat_template.html"
+BRIDGE_SCRIPT_PATH = BASE_DIR / "chat_bridge.js"
 
 try:
     CHAT_TEMPLATE = TEMPLATE_PATH.read_text(encoding="utf-8")
 except Exception:
-    CHAT_TEMPLATE = "<!DOCTYPE html><html><body>{{CHAT_CONTENT}}</body></html>"
+    CHAT_TEMPLATE = (
+        "<!DOCTYPE html><html><body><div id='chat'>{{CHAT_CONTENT}}</div>"
+        "<script src='qrc:///qtwebchannel/qwebchannel.js'></script>"
+        "<script>{{BRIDGE_SCRIPT}}</script></body></html>"
+    )
+
+try:
+    BRIDGE_SCRIPT = BRIDGE_SCRIPT_PATH.read_text(encoding="utf-8")
+except Exception as e:
+    print("Error loading chat_bridge.js:", e)
+    BRIDGE_SCRIPT = ""
+
+
+# Markdown parser, built on first render (keeps the import off the startup path).
+# CommonMark (fenced code included) + GFM tables/strikethrough; raw HTML in
+# messages is escaped, not passed through.
+_MD = None
+
+
+def prewarm() -> None:
+    # $ Import + build the parser and run each enabled rule once, off the UI thread at startup
+    _render_markdown("# a\n\n*b* `c` ~~d~~\n\n| e |\n| - |\n| f |\n\n```\ng\n```\n")
 
 
 def _render_markdown(text: str) -> str:
+    global _MD
     if not text:
         return ""
-    return markdown.markdown(
-        text,
-        extensions=["tables", "fenced_code"],
-    )
+    if _MD is None:
+        from markdown_it import MarkdownIt
+
+        _MD = MarkdownIt("commonmark", {"html": False}).enable(["table", "strikethrough"])
+    return _MD.render(text)
+
+
+# Opening/closing line of a fenced code block
+_FENCE_RE = re.compile(r"^[ ]{0,3}(?:```|~~~)", re.MULTILINE)
+
+
+def _stable_prefix_len(text: str) -> int:
+    # $ End of the part that later tokens cannot change: up to the last blank
+    # line, but never past the start of a code fence that is still open.
+    cut = text.rfind("\n\n")
+    if cut < 0:
+        return 0
+    cut += 2
+
+    fences = [m.start() for m in _FENCE_RE.finditer(text, 0, cut)]
+    if len(fences) % 2:
+        return fences[-1]
+    return cut
 
 
 def _escape_html(text: str) -> str:
-    return (
-        (text or "")
-        .replace("&", "&amp;")
-        .replace("<", "&lt;")
-        .replace(">", "&gt;")
-    )
+    return _html_escape(text or "", quote=False)
 
 
-def wrap_page(chat_html: str) -> str:
-    # $ Inject theme colors + chat content into outer template
-    theme = load_theme()
-    page = CHAT_TEMPLATE
+# {{TOKEN}} placeholders in the page template
+_TEMPLATE_TOKEN = re.compile(r"\{\{[A-Z_]+\}\}")
+
+# $ Theme-substituted templates keyed by the theme items, split around {{CHAT_CONTENT}}
+# into (head, tail)
+_THEMED_TEMPLATE_CACHE = {}
+
 
+def _themed_template(theme: dict):
+    key = tuple(sorted(theme.items()))
+    parts = _THEMED_TEMPLATE_CACHE.get(key)
+    if parts is not None:
+        return parts
+
+    page = CHAT_TEMPLATE
     replacements = {
         "{{COLOR_BG}}": theme.get("bg", "#111111"),
         "{{COLOR_FG}}": theme.get("fg", "#eeeeee"),
@@ -49,12 +98,22 @@ def wrap_page(chat_html: str) -> str:
         "{{COLOR_SCROLLBAR_TRACK}}": theme.get("scrollbar_track", "#111111"),
         "{{COLOR_SCROLLBAR_THUMB}}": theme.get("scrollbar_thumb", "#444444"),
         "{{COLOR_SCROLLBAR_THUMB_HOVER}}": theme.get("scrollbar_thumb_hover", "#666666"),
+        "{{BRIDGE_SCRIPT}}": BRIDGE_SCRIPT,
     }
 
-    for k, v in replacements.items():
-        page = page.replace(k, v)
+    # One pass over the template; unknown tokens ({{CHAT_CONTENT}}) are kept
+    page = _TEMPLATE_TOKEN.sub(lambda m: replacements.get(m.group(0), m.group(0)), page)
+
+    head, _, tail = page.partition("{{CHAT_CONTENT}}")
+    parts = (head, tail)
+    _THEMED_TEMPLATE_CACHE[key] = parts
+    return parts
 
-    return page.replace("{{CHAT_CONTENT}}", chat_html or "")
+
+def wrap_page(chat_html: str) -> str:
+    # $ Inject theme colors + chat content into outer template
+    head, tail = _themed_template(load_theme())
+    return head + (chat_html or "") + tail
 
 
 def render_system_msg(content: str) -> str:
@@ -80,6 +139,27 @@ def render_assistant_msg(reasoning: str, answer: str) -> str:
     return "<div class='msg msg-assistant'>" f"{body}" "</div>"
 
 
+def render_assistant_msg_incremental(pending: str):
+    # $ Split streamed markdown into a stable head and a still-changing tail.
+    # Returns (stable_html, tail_raw, tail_html); the caller keeps tail_raw,
+    # appends the next pieces to it and calls this again, so each stable
+    # block is rendered exactly once.
+    cut = _stable_prefix_len(pending)
+    stable_html = _render_markdown(pending[:cut]) if cut else ""
+    tail = pending[cut:]
+    return stable_html, tail, _render_markdown(tail)
+
+
+def render_streaming_msg(stable_html: str, tail_html: str) -> str:
+    # $ Reply that is still arriving; the two inner divs are updated via JS
+    return (
+        "<div class='msg msg-assistant' id='msg-streaming'>"
+        f"<div id='msg-streaming-done'>{stable_html}</div>"
+        f"<div id='msg-streaming-tail'>{tail_html}</div>"
+        "</div>"
+    )
+
+
 def render_web_links_block(content: str) -> str:
     body = _render_markdown(content or "Web search sources: (none)")
     return (
@@ -90,3 +170,67 @@ def render_web_links_block(content: str) -> str:
         "</details>"
         "</div>"
     )
+
+
+def render_search_progress(items_html: str) -> str:
+    # $ Results of a running web search, filled in via JS as pages arrive
+    return (
+        "<div class='msg msg-assistant' id='search-progress'>"
+        "<details class='web-results' open>"
+        "<summary>Fetching web pages…</summary>"
+        f"<div id='search-progress-items'>{items_html}</div>"
+        "</details>"
+        "</div>"
+    )
+
+
+def render_search_progress_item(content: str) -> str:
+    return _render_markdown(content)
+
+
+# Saved message kinds shown as the collapsible sources block
+_WEB_KINDS = frozenset(("web_links", "web_results"))
+
+
+def render_chat(messages) -> str:
+    # $ Full chat HTML for a saved history, built with one join
+    renderers = {"system": render_system_msg, "user": render_user_msg}
+    render_web = render_web_links_block
+    render_assistant = render_assistant_msg
+    web_kinds = _WEB_KINDS
+
+    parts = []
+    append = parts.append
+    for msg in messages:
+        content = msg.get("content")
+        if not content:
+            continue
+
+        kind = msg.get("kind")
+        if kind in web_kinds:
+            if kind == "web_results":
+                # Not saved yet: the page text blob, shown as its links like after a save
+                content = shrink_web_results(content)
+            append(render_web(content))
+            continue
+        if kind == "web_sources":
+            # Sources block stored already rendered (see HttpLLMChatWindow)
+            append(content)
+            continue
+
+        # Roles are stored lower-case; only odd ones pay for .lower()
+        role = msg.get("role") or ""
+        if role == "assistant":
+            append(render_assistant("", content))
+            continue
+        render = renderers.get(role)
+        if render is None:
+            role = role.lower()
+            if role == "assistant":
+                append(render_assistant("", content))
+                continue
+            render = renderers.get(role)
+        if render is not None:
+            append(render(content))
+
+    return "".join(parts)
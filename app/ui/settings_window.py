@@ -20,10 +20,9 @@ from PyQt5.QtWidgets import (
     QSpinBox,
 )
 
-from core.backend import AVAILABLE_MODELS, DEFAULT_MODEL_NAME
+from core.backend import available_models, get_default_model_name
 from core.settings import (
     load_default_model,
-    save_default_model,
     load_settings_dict,
     save_settings_dict,
     load_theme_presets,
@@ -32,15 +31,31 @@ from core.settings import (
     load_prompts_dict,
     save_prompts_dict,
     load_web_settings,
-    save_web_settings,
     DEFAULT_WEB_SEARCH_SETTINGS,
     get_title_planner_prompt,
     is_title_planner_enabled,
+    is_reply_cache_enabled,
 )
 
 DEFAULT_THEME_NAME = "Default (Dark)"
 CUSTOM_THEME_NAME = "Custom"
 
+# Stack / category rows
+PAGE_GENERAL = 0
+PAGE_THEME = 1
+PAGE_WEB = 2
+PAGE_PROMPTS = 3
+
+
+def _theme_signature(theme):
+    """Hashable form of a theme dict (None if it is not a dict of plain values)."""
+    if not isinstance(theme, dict):
+        return None
+    try:
+        return frozenset(theme.items())
+    except TypeError:
+        return None
+
 
 class SettingsOverlay(QWidget):
     """
@@ -54,10 +69,8 @@ class SettingsOverlay(QWidget):
         self.parent_window = parent_window
 
         self.setAttribute(Qt.WA_StyledBackground, True)
+        # Styled by the app QSS (#SettingsOverlay in ui/style.qss)
         self.setObjectName("SettingsOverlay")
-        self.setStyleSheet(
-            "#SettingsOverlay { background-color: rgba(0, 0, 0, 160); }"
-        )
 
         # Prompt state cache
         self.prompt_key_order = ["system", "search_planner", "web_followup"]
@@ -69,8 +82,20 @@ class SettingsOverlay(QWidget):
         self.prompts_cache: Dict[str, str] = {}
         self.current_prompt_key: str = "system"
 
+        # Stored values as loaded by the page syncs; Save edits these instead
+        # of reading the files again
+        self._settings_data: Dict[str, Any] = {}
+        self._ws_data: Dict[str, Any] = {}
+        self._prompt_overrides: Dict[str, str] = {}
+
         # Theme presets
         self.theme_presets: Dict[str, Dict[str, Any]] = load_theme_presets() or {}
+        # Preset signature -> name, so the stored theme maps back to a preset in one lookup
+        self._theme_sig_to_name: Dict[Any, str] = {}
+        for name, preset in self.theme_presets.items():
+            sig = _theme_signature(preset)
+            if sig is not None:
+                self._theme_sig_to_name.setdefault(sig, name)
 
         # Centered main panel
         self.settings_panel = QFrame(self)
@@ -122,22 +147,30 @@ class SettingsOverlay(QWidget):
             item.setSizeHint(QSize(180, 30))
             self.category_list.addItem(item)
 
-        # Stacked pages
+        # Stacked pages: built on first selection, placeholders until then
         self.stack = QStackedWidget()
         self.stack.setObjectName("SettingsStack")
 
-        self.general_page = self._build_general_page()
-        self.theme_page = self._build_theme_page()
-        self.web_page = self._build_web_search_page()
-        self.prompts_page = self._build_prompts_page()
-
-        self.stack.addWidget(self.general_page)
-        self.stack.addWidget(self.theme_page)
-        self.stack.addWidget(self.web_page)
-        self.stack.addWidget(self.prompts_page)
+        self._page_builders = {
+            PAGE_GENERAL: self._build_general_page,
+            PAGE_THEME: self._build_theme_page,
+            PAGE_WEB: self._build_web_search_page,
+            PAGE_PROMPTS: self._build_prompts_page,
+        }
+        self._page_syncers = {
+            PAGE_GENERAL: self._sync_general_page,
+            PAGE_THEME: self._sync_theme_page,
+            PAGE_WEB: self._sync_web_page,
+            PAGE_PROMPTS: self._sync_prompts_page,
+        }
+        self._built_pages = set()
+        # Input widgets per built page, silenced while syncs set their values
+        self._page_inputs: Dict[int, list] = {}
+        for _ in self._page_builders:
+            self.stack.addWidget(QWidget())
 
-        self.category_list.currentRowChanged.connect(self.stack.setCurrentIndex)
-        self.category_list.setCurrentRow(0)
+        self.category_list.currentRowChanged.connect(self._ensure_page_built)
+        self.category_list.setCurrentRow(PAGE_GENERAL)
 
         content_layout.addWidget(self.category_list)
         content_layout.addWidget(self.stack, 1)
@@ -162,13 +195,27 @@ class SettingsOverlay(QWidget):
 
         panel_layout.addLayout(buttons_layout)
 
-        # Initial sync
-        self.sync_from_settings()
-
     # ------------------------------------------------------------------ #
     # Page builders                                                      #
     # ------------------------------------------------------------------ #
 
+    def _ensure_page_built(self, index: int) -> None:
+        """Build (and sync) the page on first visit, then show it."""
+        if index < 0:
+            return
+
+        builder = self._page_builders.pop(index, None)
+        if builder is not None:
+            placeholder = self.stack.widget(index)
+            page = builder()
+            self.stack.removeWidget(placeholder)
+            placeholder.deleteLater()
+            self.stack.insertWidget(index, page)
+            self._built_pages.add(index)
+            self._run_batched(self._page_syncers[index], self._page_inputs.get(index, []))
+
+        self.stack.setCurrentIndex(index)
+
     def _build_general_page(self) -> QWidget:
         page = QWidget()
         layout = QVBoxLayout(page)
@@ -188,7 +235,7 @@ class SettingsOverlay(QWidget):
         self.model_combo = QComboBox()
         self.model_combo.setObjectName("DefaultModelCombo")
 
-        models = list(AVAILABLE_MODELS) or [DEFAULT_MODEL_NAME]
+        models = list(available_models()) or [get_default_model_name()]
         for m in models:
             self.model_combo.addItem(m)
 
@@ -199,6 +246,17 @@ class SettingsOverlay(QWidget):
         self.auto_title_checkbox.setObjectName("AutoTitleCheckbox")
         form.addRow("Auto titles:", self.auto_title_checkbox)
 
+        # --- Reply cache toggle ---
+        self.reply_cache_checkbox = QCheckBox("Reuse the reply when a chat is sent again unchanged")
+        self.reply_cache_checkbox.setObjectName("ReplyCacheCheckbox")
+        form.addRow("Reply cache:", self.reply_cache_checkbox)
+
+        self._page_inputs[PAGE_GENERAL] = [
+            self.model_combo,
+            self.auto_title_checkbox,
+            self.reply_cache_checkbox,
+        ]
+
         layout.addLayout(form)
         layout.addStretch(1)
         return page
@@ -228,6 +286,8 @@ class SettingsOverlay(QWidget):
 
         form.addRow("Theme preset:", self.theme_combo)
 
+        self._page_inputs[PAGE_THEME] = [self.theme_combo]
+
         layout.addLayout(form)
         layout.addStretch(1)
         return page
@@ -286,6 +346,10 @@ class SettingsOverlay(QWidget):
         self.web_language_combo.addItem("Auto", userData="auto")
         self.web_language_combo.addItem("English (en)", userData="en")
         form.addRow("Language:", self.web_language_combo)
+        self._lang_index = {
+            self.web_language_combo.itemData(i): i
+            for i in range(self.web_language_combo.count())
+        }
 
         # Safe search
         self.web_safesearch_combo = QComboBox()
@@ -294,6 +358,10 @@ class SettingsOverlay(QWidget):
         self.web_safesearch_combo.addItem("Moderate (1)", userData=1)
         self.web_safesearch_combo.addItem("Strict (2)", userData=2)
         form.addRow("Safe search:", self.web_safesearch_combo)
+        self._ss_index = {
+            int(self.web_safesearch_combo.itemData(i)): i
+            for i in range(self.web_safesearch_combo.count())
+        }
 
         # Show query in chat
         self.web_show_query_checkbox = QCheckBox(
@@ -309,6 +377,18 @@ class SettingsOverlay(QWidget):
         self.web_strict_only_checkbox.setObjectName("WebStrictOnlyCheckbox")
         form.addRow("Answer mode:", self.web_strict_only_checkbox)
 
+        self._page_inputs[PAGE_WEB] = [
+            self.web_enable_checkbox,
+            self.web_use_planner_checkbox,
+            self.web_max_results_spin,
+            self.web_max_pages_spin,
+            self.web_max_chars_spin,
+            self.web_language_combo,
+            self.web_safesearch_combo,
+            self.web_show_query_checkbox,
+            self.web_strict_only_checkbox,
+        ]
+
         layout.addLayout(form)
 
         # --- Reset row ---
@@ -376,16 +456,38 @@ class SettingsOverlay(QWidget):
     # Data sync                                                          #
     # ------------------------------------------------------------------ #
 
+    def _run_batched(self, fn, widgets) -> None:
+        """Call fn with panel repaints off and the widgets' signals blocked."""
+        self.settings_panel.setUpdatesEnabled(False)
+        was_blocked = [w.blockSignals(True) for w in widgets]
+        try:
+            fn()
+        finally:
+            for w, blocked in zip(widgets, was_blocked):
+                w.blockSignals(blocked)
+            # Re-enabling schedules a single repaint of the panel
+            self.settings_panel.setUpdatesEnabled(True)
+
     def sync_from_settings(self) -> None:
-        """Load current settings and prompts into the widgets."""
-        data = load_settings_dict()
+        """Load current settings and prompts into the widgets of built pages."""
+        indexes = sorted(self._built_pages)
+        widgets = [w for i in indexes for w in self._page_inputs.get(i, [])]
+
+        def sync_all():
+            for index in indexes:
+                self._page_syncers[index]()
+
+        self._run_batched(sync_all, widgets)
+
+    def _sync_general_page(self) -> None:
+        data = self._settings_data = load_settings_dict()
 
         # Default model
         explicit_default = (data.get("default_model") or "").strip()
         if explicit_default:
             model_name = explicit_default
         else:
-            model_name = load_default_model() or DEFAULT_MODEL_NAME
+            model_name = load_default_model() or get_default_model_name()
 
         idx = self.model_combo.findText(model_name)
         if idx < 0:
@@ -394,25 +496,28 @@ class SettingsOverlay(QWidget):
         
         # Auto title planner flag
         self.auto_title_checkbox.setChecked(is_title_planner_enabled())
+        self.reply_cache_checkbox.setChecked(is_reply_cache_enabled())
+
+    def _sync_theme_page(self) -> None:
+        data = self._settings_data = load_settings_dict()
 
-        # Theme
         overrides = data.get("theme") or {}
         if not overrides:
             selected_name = DEFAULT_THEME_NAME
         else:
-            selected_name = CUSTOM_THEME_NAME
-            for name, preset in self.theme_presets.items():
-                if isinstance(preset, dict) and preset == overrides:
-                    selected_name = name
-                    break
+            selected_name = self._theme_sig_to_name.get(
+                _theme_signature(overrides), CUSTOM_THEME_NAME
+            )
 
         idx = self.theme_combo.findText(selected_name)
         if idx < 0:
             idx = 0
         self.theme_combo.setCurrentIndex(idx)
 
-        # Web search
-        ws = load_web_settings()
+    def _sync_web_page(self) -> None:
+        # web_search is saved inside settings.json, so keep that loaded too
+        self._settings_data = load_settings_dict()
+        ws = self._ws_data = load_web_settings()
         self.web_enable_checkbox.setChecked(bool(ws.get("enabled", True)))
         self.web_use_planner_checkbox.setChecked(bool(ws.get("use_planner", True)))
         self.web_max_results_spin.setValue(int(ws.get("max_results", 10)))
@@ -420,26 +525,16 @@ class SettingsOverlay(QWidget):
         self.web_max_chars_spin.setValue(int(ws.get("max_chars_per_page", 6000)))
 
         lang = ws.get("language", "en") or "en"
-        lang_idx = 0
-        for i in range(self.web_language_combo.count()):
-            if self.web_language_combo.itemData(i) == lang:
-                lang_idx = i
-                break
-        self.web_language_combo.setCurrentIndex(lang_idx)
+        self.web_language_combo.setCurrentIndex(self._lang_index.get(lang, 0))
 
         ss_val = int(ws.get("safesearch", 1))
-        ss_idx = 0
-        for i in range(self.web_safesearch_combo.count()):
-            if int(self.web_safesearch_combo.itemData(i)) == ss_val:
-                ss_idx = i
-                break
-        self.web_safesearch_combo.setCurrentIndex(ss_idx)
+        self.web_safesearch_combo.setCurrentIndex(self._ss_index.get(ss_val, 0))
 
         self.web_show_query_checkbox.setChecked(bool(ws.get("show_query", True)))
         self.web_strict_only_checkbox.setChecked(bool(ws.get("strict_web_only", True)))
 
-        # Prompts
-        stored_prompts = load_prompts_dict()
+    def _sync_prompts_page(self) -> None:
+        stored_prompts = self._prompt_overrides = load_prompts_dict()
         self.prompts_cache = {}
         for key in self.prompt_key_order:
             self.prompts_cache[key] = stored_prompts.get(
@@ -486,38 +581,69 @@ class SettingsOverlay(QWidget):
     # ------------------------------------------------------------------ #
 
     def on_save_clicked(self) -> None:
-        """Persist settings + prompts + web search and notify parent window."""
-        self._save_current_prompt_from_editor()
-
-        # settings.json: default model + theme + auto_title_planner
-        data = load_settings_dict()
+        """Persist settings + prompts + web search and notify parent window.
+
+        Only pages that were opened are written; the rest keep their stored values.
+        """
+        built = self._built_pages
+
+        # settings.json: default model + theme + auto_title_planner + web_search
+        if PAGE_GENERAL in built or PAGE_THEME in built or PAGE_WEB in built:
+            data = self._settings_data
+
+            if PAGE_GENERAL in built:
+                selected_model = self.model_combo.currentText().strip()
+                if selected_model:
+                    data["default_model"] = selected_model
+
+            if PAGE_THEME in built:
+                theme_label = self.theme_combo.currentText()
+                if theme_label == DEFAULT_THEME_NAME:
+                    data.pop("theme", None)
+                elif theme_label == CUSTOM_THEME_NAME:
+                    # keep whatever is already in data["theme"], or let user edit via presets later
+                    pass
+                else:
+                    preset = self.theme_presets.get(theme_label)
+                    if isinstance(preset, dict):
+                        data["theme"] = preset
+                    else:
+                        data["theme"] = DEFAULT_THEME.copy()
+
+            # --- Auto title planner flag (MUST be set before saving) ---
+            if PAGE_GENERAL in built:
+                data["auto_title_planner"] = self.auto_title_checkbox.isChecked()
+                data["reply_cache"] = self.reply_cache_checkbox.isChecked()
+
+            # web_search (settings.json -> web_search key)
+            if PAGE_WEB in built:
+                data["web_search"] = self._collect_web_settings()
+
+            # Now actually write settings.json in one go
+            save_settings_dict(data)
 
-        selected_model = self.model_combo.currentText().strip()
-        if selected_model:
-            data["default_model"] = selected_model
-            save_default_model(selected_model)
-
-        theme_label = self.theme_combo.currentText()
-        if theme_label == DEFAULT_THEME_NAME:
-            data.pop("theme", None)
-        elif theme_label == CUSTOM_THEME_NAME:
-            # keep whatever is already in data["theme"], or let user edit via presets later
-            pass
-        else:
-            preset = self.theme_presets.get(theme_label)
-            if isinstance(preset, dict):
-                data["theme"] = preset
-            else:
-                data["theme"] = DEFAULT_THEME.copy()
+        # prompts.json
+        if PAGE_PROMPTS in built:
+            self._save_current_prompt_from_editor()
+
+            prompt_overrides = self._prompt_overrides
+            for key in self.prompt_key_order:
+                text = (self.prompts_cache.get(key) or "").strip()
+                default_val = DEFAULT_PROMPTS[key]
+                if not text or text == default_val:
+                    prompt_overrides.pop(key, None)
+                else:
+                    prompt_overrides[key] = text
+            save_prompts_dict(prompt_overrides)
 
-        # --- Auto title planner flag (MUST be set before saving) ---
-        data["auto_title_planner"] = self.auto_title_checkbox.isChecked()
+        if hasattr(self.parent_window, "on_settings_updated"):
+            self.parent_window.on_settings_updated()
 
-        # Now actually write settings.json with default_model + theme + auto_title_planner
-        save_settings_dict(data)
+        self.hide()
 
-        # web_search (settings.json -> web_search key)
-        ws = load_web_settings()
+    def _collect_web_settings(self) -> Dict[str, Any]:
+        """Web Search page widgets merged over the loaded web_search settings."""
+        ws = self._ws_data
         ws["enabled"] = self.web_enable_checkbox.isChecked()
         ws["use_planner"] = self.web_use_planner_checkbox.isChecked()
         ws["max_results"] = self.web_max_results_spin.value()
@@ -536,26 +662,13 @@ class SettingsOverlay(QWidget):
         ws["show_query"] = self.web_show_query_checkbox.isChecked()
         ws["strict_web_only"] = self.web_strict_only_checkbox.isChecked()
 
-        save_web_settings(ws)
-
-        # prompts.json
-        prompt_overrides = load_prompts_dict()
-        for key in self.prompt_key_order:
-            text = (self.prompts_cache.get(key) or "").strip()
-            default_val = DEFAULT_PROMPTS[key]
-            if not text or text == default_val:
-                prompt_overrides.pop(key, None)
-            else:
-                prompt_overrides[key] = text
-        save_prompts_dict(prompt_overrides)
-
-        if hasattr(self.parent_window, "on_settings_updated"):
-            self.parent_window.on_settings_updated()
-
-        self.hide()
+        return ws
 
     def on_web_reset_clicked(self) -> None:
         """Reset Web Search page widgets to DEFAULT_WEB_SEARCH_SETTINGS."""
+        self._run_batched(self._reset_web_widgets, self._page_inputs[PAGE_WEB])
+
+    def _reset_web_widgets(self) -> None:
         ws = DEFAULT_WEB_SEARCH_SETTINGS
 
         self.web_enable_checkbox.setChecked(bool(ws.get("enabled", True)))
@@ -565,20 +678,10 @@ class SettingsOverlay(QWidget):
         self.web_max_chars_spin.setValue(int(ws.get("max_chars_per_page", 6000)))
 
         lang = ws.get("language", "en") or "en"
-        lang_idx = 0
-        for i in range(self.web_language_combo.count()):
-            if self.web_language_combo.itemData(i) == lang:
-                lang_idx = i
-                break
-        self.web_language_combo.setCurrentIndex(lang_idx)
+        self.web_language_combo.setCurrentIndex(self._lang_index.get(lang, 0))
 
         ss_val = int(ws.get("safesearch", 1))
-        ss_idx = 0
-        for i in range(self.web_safesearch_combo.count()):
-            if int(self.web_safesearch_combo.itemData(i)) == ss_val:
-                ss_idx = i
-                break
-        self.web_safesearch_combo.setCurrentIndex(ss_idx)
+        self.web_safesearch_combo.setCurrentIndex(self._ss_index.get(ss_val, 0))
 
         self.web_show_query_checkbox.setChecked(bool(ws.get("show_query", True)))
         self.web_strict_only_checkbox.setChecked(bool(ws.get("strict_web_only", True)))
@@ -0,0 +1,71 @@
+# ui/stylesheet.py
+import re
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent
+STYLE_PATH = BASE_DIR / "style.qss"
+
+# {{TOKEN}} placeholders in ui/style.qss
+_QSS_TOKEN = re.compile(r"\{\{([A-Z_]+)\}\}")
+
+# style.qss split on its tokens: even indices are literal text, odd ones token names.
+# Read once; theme changes only redo the join.
+_SEGMENTS = None
+
+
+def _qss_segments():
+    global _SEGMENTS
+    if _SEGMENTS is None:
+        if not STYLE_PATH.exists():
+            return None
+        _SEGMENTS = _QSS_TOKEN.split(STYLE_PATH.read_text(encoding="utf-8"))
+    return _SEGMENTS
+
+
+def _qss_values(theme) -> dict:
+    # $ Token -> value: every theme key upper-cased, plus the QT_* fallbacks
+    values = {k.upper(): v for k, v in theme.items()}
+    values.update({
+        # core text / bg / accent
+        "QT_BG": theme.get("qt_bg", theme.get("bg", "#111111")),
+        "QT_FG": theme.get("qt_fg", theme.get("fg", "#eeeeee")),
+        "QT_ACCENT": theme.get("qt_accent", "#4a90e2"),
+        "QT_ACCENT_HOVER": theme.get("qt_accent_hover", "#5aa0f2"),
+        "QT_ACCENT_DISABLED": theme.get("qt_accent_disabled", "#555555"),
+        "QT_BORDER": theme.get("qt_border", "#333333"),
+
+        "QT_SIDEBAR_BG": theme.get("qt_sidebar_bg", "#101010"),
+        "QT_SIDEBAR_SELECTED_BG": theme.get("qt_sidebar_selected_bg", "#262626"),
+        "QT_SPLITTER_BG": theme.get("qt_splitter_bg", "#181818"),
+        "QT_INPUT_BG": theme.get("qt_input_bg", "#121212"),
+
+        "QT_BUTTON_BG": theme.get("qt_button_bg", "#181818"),
+        "QT_BUTTON_HOVER_BG": theme.get("qt_button_hover_bg", "#222222"),
+        "QT_BUTTON_PRESSED_BG": theme.get("qt_button_pressed_bg", "#262626"),
+        "QT_BUTTON_DISABLED_BG": theme.get("qt_button_disabled_bg", "#141414"),
+        "QT_BUTTON_DISABLED_FG": theme.get("qt_button_disabled_fg", "#555555"),
+
+        "QT_SEARCH_TOGGLE_ON_BG": theme.get("qt_search_toggle_on_bg", "#2b7a3f"),
+        "QT_SEARCH_TOGGLE_ON_HOVER_BG": theme.get("qt_search_toggle_on_hover_bg", "#33994c"),
+
+        "QT_CHECKBOX_BG": theme.get("qt_checkbox_bg", "#181818"),
+        "QT_CHECKBOX_CHECKED_BG": theme.get("qt_checkbox_checked_bg", "#2b7a3f"),
+
+        "QT_SCROLLBAR_BG": theme.get("qt_scrollbar_bg", "#111111"),
+        "QT_SCROLLBAR_HANDLE_BG": theme.get("qt_scrollbar_handle_bg", "#444444"),
+    })
+    return values
+
+
+def build_stylesheet(theme):
+    """Themed app stylesheet, or None if style.qss is missing. Unknown tokens are left as-is."""
+    segments = _qss_segments()
+    if segments is None:
+        return None
+
+    values = _qss_values(theme)
+    parts = segments[:]
+    for i in range(1, len(parts), 2):
+        key = parts[i]
+        parts[i] = values.get(key, "{{" + key + "}}")
+    return "".join(parts)
@@ -1,9 +1,20 @@
 # web/search_planner.py
-import requests
+import logging
+from collections import deque
 
-from core.backend import API_URL, DEFAULT_MODEL_NAME, N_PREDICT
+from core import jsonio
+from core.backend import API_URL, get_default_model_name, N_PREDICT, SESSION
 from core.settings import get_search_planner_prompt
 
+logger = logging.getLogger(__name__)
+
+# Planner output is cut here; longer text is not a usable search query
+MAX_QUERY_CHARS = 200
+PLANNER_NUM_PREDICT = 64
+
+# Transcript line prefix per role; other roles (e.g. system) are skipped
+_ROLE_PREFIXES = {"user": "You: ", "assistant": "Model: "}
+
 
 def _format_conversation(conversation_history, max_chars: int = 8000) -> str:
     """Turn the history into a simple transcript:
@@ -13,21 +24,27 @@ def _format_conversation(conversation_history, max_chars: int = 8000) -> str:
     if not conversation_history:
         return ""
 
-    lines = []
-    for msg in conversation_history:
-        role = (msg.get("role") or "").lower()
-        content = (msg.get("content") or "").strip()
-        if not content:
+    # Walk backwards and stop once the budget is covered: only the tail is kept anyway
+    lines = deque()
+    running = 0
+    for msg in reversed(conversation_history):
+        prefix = _ROLE_PREFIXES.get((msg.get("role") or "").lower())
+        if prefix is None:
             continue
 
-        if role == "user":
-            prefix = "You"
-        elif role == "assistant":
-            prefix = "Model"
-        else:
+        content = msg.get("content") or ""
+        # Only the tail of a huge message can make it into the transcript
+        if len(content) > max_chars:
+            content = content[-max_chars:]
+        content = content.strip()
+        if not content:
             continue
 
-        lines.append(f"{prefix}: {content}")
+        line = prefix + content
+        lines.appendleft(line)
+        running += len(line) + 1
+        if running >= max_chars:
+            break
 
     txt = "\n".join(lines)
     if len(txt) > max_chars:
@@ -43,7 +60,7 @@ def build_search_query(conversation_history, latest_user_text: str, model_name:
     if not latest_user_text:
         return ""
 
-    planner_model = (model_name or DEFAULT_MODEL_NAME).strip() or DEFAULT_MODEL_NAME
+    planner_model = (model_name or "").strip() or get_default_model_name()
     transcript = _format_conversation(conversation_history)
 
     user_prompt = get_search_planner_prompt().format(TRANSCRIPT=transcript)
@@ -58,30 +75,55 @@ def build_search_query(conversation_history, latest_user_text: str, model_name:
     payload = {
         "model": planner_model,
         "messages": messages,
-        "stream": False,
+        "stream": True,
         "think": False,
+        # Query rewriting is deterministic: greedy decoding, short output
         "options": {
-            "num_predict": N_PREDICT,
-            "temperature": 0.7,
-            "top_p": 0.9,
-            "repeat_penalty": 1.1,
+            "num_predict": min(N_PREDICT, PLANNER_NUM_PREDICT),
+            "temperature": 0.0,
+            "top_p": 1.0,
         },
     }
 
+    # Stream the reply and stop at the end of the first line: a query is one short
+    # line, so there is no point waiting for the rest. Leaving the with-block closes
+    # the connection, which makes Ollama stop generating.
+    pieces = []
     try:
-        r = requests.post(API_URL, json=payload, timeout=60)
-        r.raise_for_status()
-        data = r.json()
+        with SESSION.post(
+            API_URL,
+            data=jsonio.dumps(payload, indent=False),
+            headers={"Content-Type": "application/json"},
+            stream=True,
+            timeout=60,
+        ) as r:
+            r.raise_for_status()
+            for line in r.iter_lines():
+                if not line:
+                    continue
+                chunk = jsonio.loads(line)
+                if chunk.get("error"):
+                    raise RuntimeError(chunk["error"])
+
+                piece = (chunk.get("message") or {}).get("content") or ""
+                if piece:
+                    pieces.append(piece)
+                    text = "".join(pieces).lstrip()
+                    if "\n" in text or len(text) > MAX_QUERY_CHARS:
+                        break
+
+                if chunk.get("done"):
+                    break
     except Exception as e:
         print(f"[search_planner] ERROR request failed: {e}")
         # If anything goes wrong, just search with the user’s last text.
         return latest_user_text
 
-    msg = data.get("message") or {}
-    raw_content = (msg.get("content") or "").strip()
+    text = "".join(pieces).strip()
+    raw_content = text.partition("\n")[0].strip()[:MAX_QUERY_CHARS]
 
-    # For debugging: print whatever the planner actually returned
-    print("[search_planner] RAW:", repr(raw_content))
+    # For debugging: whatever the planner actually returned (formatted only if DEBUG is on)
+    logger.debug("[search_planner] RAW: %r", raw_content)
 
     # If the planner gave nothing, fall back to the last user text
     if not raw_content:
@@ -1,11 +1,46 @@
 # searx_client.py
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
 import requests
+from requests.adapters import HTTPAdapter
 from bs4 import BeautifulSoup
 from typing import List, Dict, Any
 
+from core import jsonio
+from web.web_cache import cache_get, cache_put, SEARCH_TTL, PAGE_TTL
+
+# selectolax is optional: its C parser extracts page text much faster,
+# BeautifulSoup is used when it is missing.
+try:
+    from selectolax.parser import HTMLParser
+except ImportError:
+    HTMLParser = None
+
+# Tree builder for the BeautifulSoup fallback: lxml's C parser if installed
+try:
+    import lxml  # noqa: F401
+    _BS_PARSER = "lxml"
+except ImportError:
+    _BS_PARSER = "html.parser"
+
 # SearXNG endpoint (Docker usually maps it like: 0.0.0.0:8888->8080/tcp)
 SEARX_URL = "http://127.0.0.1:8888/search"
 
+# Page bodies are read up to max_chars * this many bytes (room for markup overhead)
+HTML_BYTES_PER_CHAR = 8
+
+# Elements whose text is never page content (code, styling, site navigation chrome)
+_STRIP_TAGS = ("script", "style", "noscript", "nav", "footer", "header")
+_STRIP_SELECTOR = ", ".join(_STRIP_TAGS)
+
+# Shared HTTP session: keep-alive for SearX and for repeated page hosts.
+# pool_connections is the number of hosts kept: SearX plus up to 10 pages
+# (max_pages) per search must fit, or earlier hosts' connections get evicted.
+_SESSION = requests.Session()
+_SESSION.mount("http://", HTTPAdapter(pool_connections=16, pool_maxsize=16))
+_SESSION.mount("https://", HTTPAdapter(pool_connections=16, pool_maxsize=16))
+_SESSION.headers["User-Agent"] = "Mozilla/5.0 (compatible; LocalLLM/0.1)"
+
 
 # Raised when the SearXNG request fails.
 class SearchError(Exception):
@@ -50,37 +85,56 @@ def search_web(
     if categories:
         params["categories"] = categories
 
+    # Same query + options within SEARCH_TTL: reuse the earlier results
+    cache_key = [query, num_results, params.get("language"), params.get("safesearch"), categories]
+    cached = cache_get("search", cache_key, SEARCH_TTL)
+    if isinstance(cached, list):
+        return cached
+
     try:
-        resp = requests.get(SEARX_URL, params=params, timeout=timeout)
+        resp = _SESSION.get(SEARX_URL, params=params, timeout=timeout)
         resp.raise_for_status()
-        data = resp.json()
+        data = jsonio.loads(resp.content)
     except Exception as e:
         raise SearchError(f"SearXNG request failed: {e}") from e
 
     raw_results = data.get("results") or []
-    results: List[Dict[str, Any]] = []
 
-    for item in raw_results:
-        title = (item.get("title") or "").strip()
-        url = (item.get("url") or "").strip()
-        snippet = (item.get("content") or item.get("snippet") or "").strip()
+    # Results without a URL are skipped, so the cut to num_results comes last
+    results: List[Dict[str, Any]] = [
+        {
+            "title": (item.get("title") or "").strip() or url,
+            "url": url,
+            "snippet": (item.get("content") or item.get("snippet") or "").strip(),
+        }
+        for item in raw_results
+        for url in ((item.get("url") or "").strip(),)
+        if url
+    ][:num_results]
 
-        if not url:
-            continue
+    if results:
+        cache_put("search", cache_key, results)
+    return results
 
-        results.append(
-            {
-                "title": title or url,
-                "url": url,
-                "snippet": snippet,
-            }
-        )
 
-        if len(results) >= num_results:
-            break
+# Visible text of an HTML document, whitespace-separated.
+def _html_to_text(html: str) -> str:
+    if HTMLParser is not None:
+        tree = HTMLParser(html)
+        for node in tree.css(_STRIP_SELECTOR):
+            node.decompose()
+        root = tree.body or tree.root
+        if root is None:
+            return ""
+        return root.text(separator=" ", strip=True)
 
-    return results
+    soup = BeautifulSoup(html, _BS_PARSER)
 
+    for tag in soup(_STRIP_TAGS):
+        tag.decompose()
+
+    # Same output as joining soup.stripped_strings, without a per-node Python generator
+    return soup.get_text(separator=" ", strip=True)
 
 
 # Fetch a page and return plain text (no HTML), truncated to max_chars.
@@ -89,30 +143,121 @@ def fetch_page_text(url: str, max_chars: int = 8000, timeout: int = 15) -> str:
     if not url:
         return ""
 
+    cached = _cached_page_text(url, max_chars)
+    if cached is not None:
+        return cached
+    return _download_page_text(url, max_chars, timeout)
+
+
+def _cached_page_text(url: str, max_chars: int):
+    # $ Text from an earlier fetch of this url within PAGE_TTL, else None
+    cached = cache_get("page", [url, max_chars], PAGE_TTL)
+    return cached if isinstance(cached, str) else None
+
+
+def _download_page_text(url: str, max_chars: int, timeout: int) -> str:
+    # Only max_chars of text are kept, so a bounded prefix of the markup is enough
+    limit = None
+    if max_chars is not None and max_chars > 0:
+        limit = max_chars * HTML_BYTES_PER_CHAR
+
+    # Stream, so the body is only downloaded once the headers say it is HTML
     try:
-        headers = {
-            "User-Agent": "Mozilla/5.0 (compatible; LocalLLM/0.1)"
-        }
-        resp = requests.get(url, headers=headers, timeout=timeout)
-        resp.raise_for_status()
+        headers = {}
+        if limit is not None:
+            # Servers that honor Range stop sending after the prefix (206);
+            # others ignore it and the read below stops at the same point.
+            headers["Range"] = f"bytes=0-{limit - 1}"
+        resp = _SESSION.get(url, headers=headers or None, timeout=timeout, stream=True)
     except Exception:
         return ""
 
-    content_type = resp.headers.get("content-type", "")
-    if "text/html" not in content_type:
-        return ""
+    with resp:
+        try:
+            resp.raise_for_status()
+        except Exception:
+            return ""
 
-    html = resp.text
-    soup = BeautifulSoup(html, "html.parser")
+        content_type = resp.headers.get("content-type", "")
+        if "text/html" not in content_type:
+            return ""
 
-    for tag in soup(["script", "style", "noscript"]):
-        tag.decompose()
+        body = bytearray()
+        try:
+            for chunk in resp.iter_content(chunk_size=16384):
+                body += chunk
+                if limit is not None and len(body) >= limit:
+                    break
+        except Exception:
+            return ""
 
-    text = " ".join(chunk.strip() for chunk in soup.stripped_strings)
+        encoding = resp.encoding or resp.apparent_encoding or "utf-8"
+
+    try:
+        html = body.decode(encoding, errors="replace")
+    except LookupError:
+        html = body.decode("utf-8", errors="replace")
+
+    text = _html_to_text(html)
     if not text:
         return ""
 
     if max_chars is not None and max_chars > 0 and len(text) > max_chars:
         text = text[:max_chars] + " …"
 
+    cache_put("page", [url, max_chars], text)
     return text
+
+
+# Fetch several pages in parallel; results keep the order of urls.
+# Page fetches are network-bound, so total time is ~the slowest page, not the sum.
+# on_page(index, text), if given, is called for each page as soon as it is available.
+# should_stop(), if given, is checked as pages complete; when it returns True the
+# remaining fetches are dropped and the texts gathered so far are returned.
+def fetch_pages_text(
+    urls: List[str],
+    max_chars: int = 8000,
+    timeout: int = 15,
+    max_workers: int = 8,
+    on_page=None,
+    should_stop=None,
+) -> List[str]:
+    if not urls:
+        return []
+
+    # Empty urls and cached pages are filled in here; only the rest take a worker
+    texts = [""] * len(urls)
+    todo = []
+    for i, u in enumerate(urls):
+        if not u:
+            continue
+        cached = _cached_page_text(u, max_chars)
+        if cached is not None:
+            texts[i] = cached
+            if on_page is not None:
+                on_page(i, cached)
+        else:
+            todo.append((i, u))
+    if not todo:
+        return texts
+
+    workers = max(1, min(max_workers, len(todo)))
+    pool = ThreadPoolExecutor(max_workers=workers)
+    stopped = False
+    try:
+        futures = {
+            pool.submit(_download_page_text, u, max_chars, timeout): i
+            for i, u in todo
+        }
+        for fut in as_completed(futures):
+            if should_stop is not None and should_stop():
+                stopped = True
+                break
+            i = futures[fut]
+            texts[i] = fut.result() or ""
+            if on_page is not None:
+                on_page(i, texts[i])
+    finally:
+        # When stopped, queued fetches are cancelled and running ones are not waited for
+        pool.shutdown(wait=not stopped, cancel_futures=True)
+    return texts
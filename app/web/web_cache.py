@@ -0,0 +1,128 @@
+# web/web_cache.py
+import hashlib
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from pathlib import Path
+
+from core import jsonio
+
+# app/data/web_cache/: one <sha256>.json per cached search or page
+CACHE_DIR = Path(__file__).resolve().parent.parent / "data" / "web_cache"
+
+# How long entries stay valid (seconds)
+SEARCH_TTL = 10 * 60
+PAGE_TTL = 24 * 60 * 60
+# Files older than every TTL (and stray temp files) are deleted by _prune_disk
+MAX_TTL = max(SEARCH_TTL, PAGE_TTL)
+# Files kept on disk at most (oldest go first), checked every PRUNE_EVERY writes
+MAX_DISK_ENTRIES = 2048
+PRUNE_EVERY = 128
+
+# Recently used entries are also kept in memory: path -> (written_at, value).
+# Pages are fetched from several threads, hence the lock.
+MEMORY_CACHE_SIZE = 256
+_memory = OrderedDict()
+_memory_lock = threading.Lock()
+
+
+def _remember(path: Path, written_at: float, value) -> None:
+    with _memory_lock:
+        _memory[path] = (written_at, value)
+        _memory.move_to_end(path)
+        while len(_memory) > MEMORY_CACHE_SIZE:
+            _memory.popitem(last=False)
+
+
+# The directory is pruned before the first write of a run, then every PRUNE_EVERY writes
+_writes_until_prune = 0
+_prune_lock = threading.Lock()
+
+
+def _prune_disk() -> None:
+    # $ Delete cache files that no TTL can still accept, then the oldest beyond
+    # MAX_DISK_ENTRIES
+    cutoff = time.time() - MAX_TTL
+    try:
+        entries = list(os.scandir(CACHE_DIR))
+    except OSError:
+        return
+
+    kept = []
+    for entry in entries:
+        try:
+            mtime = entry.stat().st_mtime
+            if mtime < cutoff:
+                os.remove(entry.path)
+            else:
+                kept.append((mtime, entry.path))
+        except OSError:
+            pass
+
+    if len(kept) > MAX_DISK_ENTRIES:
+        kept.sort()
+        for _, path in kept[: len(kept) - MAX_DISK_ENTRIES]:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+
+def _maybe_prune() -> None:
+    global _writes_until_prune
+    with _prune_lock:
+        if _writes_until_prune > 0:
+            _writes_until_prune -= 1
+            return
+        _writes_until_prune = PRUNE_EVERY
+    _prune_disk()
+
+
+def _cache_path(kind: str, key) -> Path:
+    raw = jsonio.dumps([kind, key], indent=False)
+    return CACHE_DIR / f"{hashlib.sha256(raw).hexdigest()}.json"
+
+
+def cache_get(kind: str, key, ttl: int):
+    # $ Cached value for (kind, key) if younger than ttl, else None
+    path = _cache_path(kind, key)
+    now = time.time()
+
+    with _memory_lock:
+        hit = _memory.get(path)
+        if hit is not None:
+            _memory.move_to_end(path)
+    if hit is not None and now - hit[0] < ttl:
+        return hit[1]
+
+    try:
+        written_at = path.stat().st_mtime
+        if now - written_at >= ttl:
+            # Expired for this kind: nothing will read it again
+            path.unlink()
+            return None
+        value = jsonio.loads(path.read_bytes())
+    except Exception:
+        return None
+    _remember(path, written_at, value)
+    return value
+
+
+def cache_put(kind: str, key, value) -> None:
+    # $ Store value; written to a unique temp file first since pages are fetched in parallel
+    path = _cache_path(kind, key)
+    _remember(path, time.time(), value)
+    _maybe_prune()
+    tmp_path = path.with_name(f"{path.stem}.{uuid.uuid4().hex}.tmp")
+    try:
+        CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        tmp_path.write_bytes(jsonio.dumps(value, indent=False))
+        os.replace(tmp_path, path)
+    except Exception as e:
+        print("Error writing web cache:", e)
+        try:
+            tmp_path.unlink()
+        except OSError:
+            pass
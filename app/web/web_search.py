@@ -1,26 +1,166 @@
 # web_search.py
+from concurrent.futures import ThreadPoolExecutor
+from typing import NamedTuple
+from urllib.parse import urlsplit
 
-from PyQt5.QtCore import QObject, pyqtSignal
-from web.searx_client import search_web, fetch_page_text
+from PyQt5.QtCore import QObject, pyqtSignal, pyqtSlot
+from web.searx_client import search_web, fetch_pages_text
 from web.search_planner import build_search_query
 from core.settings import load_web_settings
+from ui import renderer
+
+
+# Line breaks -> spaces, so a page excerpt stays inside one markdown quote line
+_NL_TABLE = str.maketrans({"\n": " ", "\r": " "})
+
+# Between results in the markdown shown to the user
+_MD_SEPARATOR = "\n\n---\n\n"
+
+# Query parameters that only track the click, not the page
+_TRACKING_PARAMS = ("utm_", "fbclid", "gclid")
+
+
+def _canonical_url(url: str) -> str:
+    """Key under which two result URLs count as the same page.
+
+    Ignores http vs https, host case, a trailing slash, tracking parameters and the fragment.
+    """
+    try:
+        parts = urlsplit(url)
+    except ValueError:
+        return url
+    query = "&".join(
+        kv for kv in parts.query.split("&")
+        if kv and not kv.startswith(_TRACKING_PARAMS)
+    )
+    path = parts.path.rstrip("/") or "/"
+    return f"{parts.netloc.lower()}{path}?{query}"
+
+
+def _distinct_results(results, limit: int):
+    """First `limit` results, skipping ones whose URL repeats an earlier result."""
+    seen = set()
+    picked = []
+    for item in results:
+        url = (item.get("url") or "").strip()
+        if url:
+            key = _canonical_url(url)
+            if key in seen:
+                continue
+            seen.add(key)
+        picked.append(item)
+        if len(picked) >= limit:
+            break
+    return picked
+
+
+class _Result(NamedTuple):
+    """One search result, normalized once: numbered from 1, fields stripped."""
+    i: int
+    title: str
+    url: str
+    snippet: str
+
+
+def _normalize_result(i, item) -> _Result:
+    return _Result(
+        i,
+        (item.get("title") or "").strip() or f"Result {i}",
+        (item.get("url") or "").strip(),
+        (item.get("snippet") or "").strip(),
+    )
+
+
+def _format_result(result: _Result, page_text):
+    """(markdown parts shown to the user, context tuple for the model) for one result.
+
+    The context tuple is (title, url, snippet, page_text); it is only turned into
+    prompt text by build_context_text() once the search has finished.
+    """
+    i, title, url, snippet = result
+    page_text = page_text or ""
+
+    if not url:
+        # Nothing was fetched: title + snippet only
+        snippet_md = f"\n{snippet}" if snippet else ""
+        return [f"{i}. {title}{snippet_md}"], (title, url, snippet, "")
+
+    md_parts = [f"{i}. [{title}]({url})"]
+    if snippet:
+        md_parts.append(f"\n{snippet}")
+    if page_text:
+        excerpt = page_text[:400].translate(_NL_TABLE)
+        md_parts.append("\n\n> ")
+        md_parts.append(excerpt)
+
+    return md_parts, (title, url, snippet, page_text)
+
+
+# Between two results in the model's context text
+_CTX_SEP = "\n\n\n"
+
+
+def build_context_text(context_blocks, header: str = "") -> str:
+    """Plain text fed to the model for the (title, url, snippet, page_text) tuples.
+
+    header is put in front within the same join, so the page text is copied once.
+    """
+    if not context_blocks:
+        return header + "No usable page content found."
+
+    # One flat list of pieces (separators included) and a single join
+    parts = [header]
+    append = parts.append
+    for i, (title, url, snippet, page_text) in enumerate(context_blocks, start=1):
+        if i > 1:
+            append(_CTX_SEP)
+        append(f"Result {i}: {title}\nURL: {url}")
+        if snippet:
+            append("\nSnippet: ")
+            append(snippet)
+        if page_text:
+            append("\nContent:\n")
+            append(page_text)
+
+    return "".join(parts)
 
 
 class WebSearchWorker(QObject):
-    # $ Signals: raw_message, search_query, md_block, context_blocks
-    finished = pyqtSignal(str, str, str, list)
+    # $ Signals: raw_message, search_query, links_html, search_context, has_page_text
+    # (links_html: the rendered sources block; search_context: the web_results message
+    # for the model, "" if there were no results; has_page_text: whether any page
+    # returned content). Both strings are built here, off the UI thread.
+    finished = pyqtSignal(str, str, str, str, bool)
+    # $ One fetched result, in arrival order: index, rendered HTML
+    progress = pyqtSignal(int, str)
     error = pyqtSignal(str)
+    # $ Emitted instead of finished/error after cancel()
+    cancelled = pyqtSignal()
 
-    def __init__(self, planner_history, raw_message, model_name, parent=None):
+    def __init__(self, planner_history, raw_message, model_name, parent=None, web_settings=None):
         super().__init__(parent)
+        self.set_job(planner_history, raw_message, model_name, web_settings)
+
+    def set_job(self, planner_history, raw_message, model_name, web_settings=None):
+        # $ Input of the next run(); a worker is reused across searches
         self.planner_history = planner_history or []
         self.raw_message = raw_message or ""
         self.model_name = model_name
+        # Settings snapshot taken by the caller; loaded in run() if not given
+        self.web_settings = web_settings
+        self._cancelled = False
+
+    def cancel(self):
+        # $ Called from the UI thread; run() stops at its next check and emits cancelled
+        self._cancelled = True
 
+    @pyqtSlot()
     def run(self):
         try:
-            # Load web search settings each run (so changes in settings take effect)
-            ws = load_web_settings()
+            # Settings as of this search (so changes in settings take effect)
+            ws = self.web_settings
+            if ws is None:
+                ws = load_web_settings()
 
             use_planner = bool(ws.get("use_planner", True))
             max_results = int(ws.get("max_results", 10))
@@ -29,79 +169,107 @@ class WebSearchWorker(QObject):
             language = ws.get("language", "en") or "en"
             safesearch = int(ws.get("safesearch", 1))
 
-            # 1) Build search query (planner or raw)
+            def run_search(query):
+                return search_web(
+                    query,
+                    num_results=max_results,
+                    language=language,
+                    safesearch=safesearch,
+                    # categories is left as SearX default ("general")
+                )
+
+            # 1) + 2) Build search query (planner or raw) and run SearXNG.
+            # With the planner on, the raw text is searched while the planner
+            # runs: if the planner fails or returns the same text, those results
+            # are used as-is instead of waiting for a second search.
             if use_planner:
-                try:
-                    search_query = build_search_query(
-                        self.planner_history,
-                        self.raw_message,
-                        self.model_name,
-                    )
-                except Exception:
-                    # Fallback: use raw user text directly
-                    search_query = self.raw_message
+                with ThreadPoolExecutor(max_workers=2) as pool:
+                    raw_future = pool.submit(run_search, self.raw_message)
+                    try:
+                        search_query = build_search_query(
+                            self.planner_history,
+                            self.raw_message,
+                            self.model_name,
+                        )
+                    except Exception:
+                        # Fallback: use raw user text directly
+                        search_query = self.raw_message
+
+                    if search_query.strip() == self.raw_message.strip():
+                        results = raw_future.result()
+                    else:
+                        raw_future.cancel()
+                        results = run_search(search_query)
             else:
                 search_query = self.raw_message
+                results = run_search(search_query)
+
+            if self._cancelled:
+                self.cancelled.emit()
+                return
 
-            # 2) Run SearXNG
-            results = search_web(
-                search_query,
-                num_results=max_results,
-                language=language,
-                safesearch=safesearch,
-                # categories is left as SearX default ("general")
-            )
             if not results:
                 self.error.emit("Web search returned no results.")
                 return
 
             # 3) Fetch page text + build markdown + context blocks
-            md_lines = []
+            # max_pages distinct pages: duplicate URLs would be fetched twice
+            top = [
+                _normalize_result(i, item)
+                for i, item in enumerate(_distinct_results(results, max_pages), start=1)
+            ]
+            formatted = [None] * len(top)
+
+            def on_page(idx, page_text):
+                # Called as each page arrives: format it and show it right away
+                formatted[idx] = _format_result(top[idx], page_text)
+                if not self._cancelled:
+                    self.progress.emit(
+                        idx, renderer.render_search_progress_item("".join(formatted[idx][0]))
+                    )
+
+            # All pages are downloaded at once, one worker per page
+            fetch_pages_text(
+                [result.url for result in top],
+                max_chars=max_chars_per_page,
+                max_workers=max_pages,
+                on_page=on_page,
+                should_stop=lambda: self._cancelled,
+            )
+            if self._cancelled:
+                self.cancelled.emit()
+                return
+
+            # Final output in result order.
+            # User markdown goes into one flat list (separators included), joined once
+            md_out = []
             context_blocks = []
+            for idx, result in enumerate(top):
+                md_parts, context_block = formatted[idx] or _format_result(result, "")
+                if md_out:
+                    md_out.append(_MD_SEPARATOR)
+                md_out.extend(md_parts)
+                context_blocks.append(context_block)
 
-            for i, item in enumerate(results[:max_pages], start=1):
-                title = (item.get("title") or "").strip() or f"Result {i}"
-                url = (item.get("url") or "").strip()
-                snippet = (item.get("snippet") or "").strip()
-
-                page_text = ""
-                if url:
-                    page_text = fetch_page_text(url, max_chars=max_chars_per_page) or ""
-
-                # Markdown shown to the user
-                if url:
-                    md_piece = f"{i}. [{title}]({url})"
-                else:
-                    md_piece = f"{i}. {title}"
-
-                if snippet:
-                    md_piece += f"\n{snippet}"
-
-                if page_text:
-                    excerpt = page_text[:400].replace("\n", " ")
-                    md_piece += "\n\n> " + excerpt
-
-                md_lines.append(md_piece)
-
-                # Plain text block fed to the model
-                block_lines = [
-                    f"Result {i}: {title}",
-                    f"URL: {url}",
-                ]
-                if snippet:
-                    block_lines.append(f"Snippet: {snippet}")
-                if page_text:
-                    block_lines.append("Content:")
-                    block_lines.append(page_text)
-
-                context_blocks.append("\n".join(block_lines))
-
-            if md_lines:
-                md_block = "\n\n---\n\n".join(md_lines)
-            else:
-                md_block = "_no results_"
+            md_block = "".join(md_out) or "_no results_"
+            links_html = renderer.render_web_links_block(md_block)
+
+            search_context = ""
+            if context_blocks:
+                search_context = build_context_text(
+                    context_blocks,
+                    header=(
+                        "Web search results and page content.\n"
+                        f"Original user message: {self.raw_message}\n"
+                        f"Search query used: {search_query}\n\n"
+                    ),
+                )
 
-            self.finished.emit(self.raw_message, search_query, md_block, context_blocks)
+            has_page_text = any(block[3] for block in context_blocks)
+
+            self.finished.emit(
+                self.raw_message, search_query, links_html, search_context, has_page_text
+            )
 
         except Exception as e:
             self.error.emit(str(e))
@@ -1,7 +1,20 @@
-from pathlib import Path
-
-from PyQt5.QtCore import Qt, QEvent, QThread, QTimer, pyqtSignal, QObject
+import hashlib
+from collections import OrderedDict, deque
+
+from PyQt5.QtCore import (
+    Qt,
+    QEvent,
+    QMetaObject,
+    QRunnable,
+    QThread,
+    QThreadPool,
+    QTimer,
+    pyqtSignal,
+    pyqtSlot,
+    QObject,
+)
 from PyQt5.QtGui import QFont, QKeySequence, QColor
+from PyQt5.QtWebChannel import QWebChannel
 from PyQt5.QtWebEngineWidgets import QWebEngineView
 from PyQt5.QtWidgets import (
     QApplication,
@@ -13,8 +26,7 @@ from PyQt5.QtWidgets import (
     QPushButton,
     QComboBox,
     QLabel,
-    QListWidget,
-    QListWidgetItem,
+    QListView,
     QSplitter,
     QMenu,
     QInputDialog,
@@ -23,14 +35,15 @@ from PyQt5.QtWidgets import (
     QFrame,
 )
 
-from core import chat_state
+from core import chat_state, jsonio
 from core.chat_title import build_chat_title
 from core.backend import (
     API_URL,
-    AVAILABLE_MODELS,
-    DEFAULT_MODEL_NAME,
+    available_models,
+    get_default_model_name,
     MAX_TOKENS,
     N_PREDICT,
+    NOTE_KINDS,
     Worker,
 )
 from core.settings import (
@@ -40,9 +53,13 @@ from core.settings import (
     get_web_followup_instruction,
     load_web_settings,
     is_title_planner_enabled,
+    is_reply_cache_enabled,
 )
 from ui import renderer
+from ui.chat_bridge import ChatBridge
+from ui.chat_list import ChatListDelegate, ChatListModel
 from ui.settings_window import SettingsOverlay
+from ui.stylesheet import build_stylesheet
 from web.web_search import WebSearchWorker
 
 
@@ -51,66 +68,100 @@ from web.web_search import WebSearchWorker
 # --------------------------------------------------------------------------- #
 
 
-class ChatListItemWidget(QWidget):
-    delete_clicked = pyqtSignal()
+class TitleWorker(QObject):
+    finished = pyqtSignal(str)
+    error = pyqtSignal(str)
+
+    def __init__(self, history=None, model_name=None):
+        super().__init__()
+        self.set_job(history, model_name)
+
+    def set_job(self, history, model_name) -> None:
+        self.history = history
+        self.model_name = model_name
 
-    def __init__(self, title: str, parent=None):
-        super().__init__(parent)
+    @pyqtSlot()
+    def run(self):
+        try:
+            title = build_chat_title(self.history, self.model_name)
+            self.finished.emit(title or "")
+        except Exception as e:
+            self.error.emit(str(e))
 
-        self.setAttribute(Qt.WA_StyledBackground, False)
 
-        layout = QHBoxLayout(self)
-        layout.setContentsMargins(6, 2, 6, 2)
-        layout.setSpacing(4)
+# Roles the search planner keeps, as stored by the app
+_PLANNER_ROLES = frozenset(("user", "assistant"))
 
-        self.label = QLabel(title)
-        self.label.setObjectName("ChatListTitleLabel")
-        self.label.setStyleSheet("background: transparent;")
-        layout.addWidget(self.label, 1)
 
-        self.close_button = QPushButton("✕")
-        self.close_button.setObjectName("ChatListCloseButton")
-        self.close_button.setFlat(True)
-        self.close_button.setFocusPolicy(Qt.NoFocus)
-        self.close_button.setVisible(False)
-        self.close_button.setFixedSize(18, 18)
-        self.close_button.setStyleSheet(
-            "QPushButton {"
-            "  border: none;"
-            "  background: transparent;"
-            "  padding: 0px;"
-            "}"
-        )
-        self.close_button.clicked.connect(self.delete_clicked.emit)
-        layout.addWidget(self.close_button)
+def _is_planner_msg(msg) -> bool:
+    # $ Messages the search planner sees: user/assistant turns, minus web result dumps
+    role = msg.get("role")
+    if role not in _PLANNER_ROLES:
+        # Roles are stored lower-case; only odd ones pay for .lower()
+        role = (role or "").lower()
+        if role not in _PLANNER_ROLES:
+            return False
+    return role == "user" or msg.get("kind") != "web_results"
 
-    def set_title(self, title: str) -> None:
-        self.label.setText(title)
 
-    def enterEvent(self, event):
-        self.close_button.setVisible(True)
-        super().enterEvent(event)
+# Replies at least this long, or with a code fence, are rendered on a worker thread
+ASYNC_RENDER_CHARS = 2048
 
-    def leaveEvent(self, event):
-        self.close_button.setVisible(False)
-        super().leaveEvent(event)
+# Streamed tokens are rendered and shown at most this often (~60 fps)
+STREAM_FLUSH_MS = 16
 
+# The input box height follows its text at most this often
+INPUT_RESIZE_MS = 16
 
-class TitleWorker(QObject):
-    finished = pyqtSignal(str)
-    error = pyqtSignal(str)
+# UI scale (fonts + chat zoom) is kept on multiples of this
+UI_SCALE_STEP = 0.05
 
-    def __init__(self, history, model_name):
+# Chats whose rendered HTML is kept in memory; others are rendered from history when shown
+HTML_CACHE_SIZE = 4
+
+# Replies kept for re-sends of an unchanged chat (only when "reply_cache" is on)
+REPLY_CACHE_SIZE = 256
+
+
+def _reply_cache_key(model_name, history) -> str:
+    # $ Hash of what the worker would send: model + (role, content) of every message
+    messages = [
+        [m.get("role", "user"), m.get("content", "")]
+        for m in history
+        if m.get("kind") not in NOTE_KINDS
+    ]
+    raw = jsonio.dumps({"model": model_name, "messages": messages}, indent=False)
+    return hashlib.sha256(raw).hexdigest()
+
+
+class RenderSignals(QObject):
+    # $ slot (see HttpLLMChatWindow._view_steps), rendered HTML
+    ready = pyqtSignal(object, str)
+
+
+class PrewarmTask(QRunnable):
+    def run(self):
+        try:
+            renderer.prewarm()
+        except Exception as e:
+            print("Error prewarming renderer:", e)
+
+
+class RenderTask(QRunnable):
+    def __init__(self, slot, reasoning, answer, signals):
         super().__init__()
-        self.history = history
-        self.model_name = model_name
+        self.slot = slot
+        self.reasoning = reasoning
+        self.answer = answer
+        self.signals = signals
 
     def run(self):
         try:
-            title = build_chat_title(self.history, self.model_name)
-            self.finished.emit(title or "")
+            html = renderer.render_assistant_msg(self.reasoning, self.answer)
         except Exception as e:
-            self.error.emit(str(e))
+            print("Error rendering message:", e)
+            html = renderer.render_system_msg(self.answer)
+        self.signals.ready.emit(self.slot, html)
 
 
 # --------------------------------------------------------------------------- #
@@ -129,27 +180,109 @@ class HttpLLMChatWindow(QMainWindow):
         self.base_font_size = base_font.pointSizeF() or 10.0
         self.default_ui_scale = 1.5
         self.ui_scale = self.default_ui_scale
+        # Scale the fonts were last set for (None until apply_ui_scale runs)
+        self._applied_ui_scale = None
 
         # Chat / worker state
-        self.chats = []  # list[dict]: {"title","model","history","html"}
+        self.chats = []  # list[dict]: {"title","model","history","html","rev"}
+        # Chats holding their "html" (list of rendered fragments), least recently
+        # shown first (id -> chat); the rest have html None until shown
+        self._html_chats = OrderedDict()
         self.current_chat_index = -1
 
-        self.thread = None
-        self.worker = None
-        self.search_thread = None
-        self.search_worker = None
+        # Chat, web search and title workers all run on one long-lived thread,
+        # one job at a time. Each worker is created once; a job is set_job() +
+        # _run_net_worker(), which queues it on the thread's event loop. That queue
+        # holds at most one turn: llm_busy is set by _begin_llm_cycle and a send
+        # while it is set is refused (its text stays in the input box).
+        self.net_thread = QThread(self)
+        self.net_thread.start()
+
+        self.worker = Worker(None, None)
+        self.search_worker = WebSearchWorker(None, None, None)
+        self.title_worker = TitleWorker()
+        for worker in (self.worker, self.search_worker, self.title_worker):
+            worker.moveToThread(self.net_thread)
+
+        self.worker.token.connect(self.on_reply_token)
+        self.worker.finished.connect(self.on_reply_ready)
+        self.worker.error.connect(self.on_reply_error)
+
+        self.search_worker.progress.connect(self.on_web_search_progress)
+        self.search_worker.finished.connect(self.on_web_search_finished)
+        self.search_worker.error.connect(self.on_web_search_error)
+        self.search_worker.cancelled.connect(self.on_web_search_cancelled)
+
+        self.title_worker.finished.connect(self.on_title_ready)
+        self.title_worker.error.connect(self.on_title_error)
 
         # Single-job guard (chat + title planner + web follow-up)
         self.llm_busy = False
 
-        # Title planner worker
-        self.title_thread = None
-        self.title_worker = None
+        # key -> (reasoning, content), least recently used first; _reply_key is
+        # the key of the reply in flight (None when it is not to be cached)
+        self._reply_cache = OrderedDict()
+        self._reply_key = None
+
+        # Reply currently streaming in: target chat, rendered stable blocks,
+        # raw markdown tail that may still change + its rendered HTML
+        self.stream_chat = None
+        self.stream_html_parts = []
+        self.stream_tail = ""
+        self.stream_tail_html = ""
+        # Whether the page has the placeholder (see _show_stream_block)
+        self._stream_shown = False
+        # Tokens are rendered + pushed to the page at most once per frame: the
+        # tail collects them, this timer flushes it
+        self._stream_flush_timer = QTimer(self)
+        self._stream_flush_timer.setSingleShot(True)
+        self._stream_flush_timer.setInterval(STREAM_FLUSH_MS)
+        self._stream_flush_timer.timeout.connect(self._flush_stream)
+
+        # Chat view: the page is loaded once (setHtml) and only rebuilt on theme
+        # changes; everything else goes through the web channel bridge.
+        # Updates issued while the page loads are queued until it connects.
+        self._page_ready = False
+        self._pending_view_updates = []
+        # Chat whose content the page shows (switching back to it is a no-op)
+        self._shown_chat = None
+
+        # Chat changes waiting behind a reply that is still rendering on
+        # render_pool, in order. Each is a [step, ...] slot; step is None until ready.
+        self._view_steps = deque()
+        # One thread, kept for the app's lifetime (the default pool retires idle
+        # threads after 30 s); rendering holds the GIL, more threads would not help
+        self.render_pool = QThreadPool(self)
+        self.render_pool.setMaxThreadCount(1)
+        self.render_pool.setExpiryTimeout(-1)
+        self.render_signals = RenderSignals(self)
+        self.render_signals.ready.connect(self._on_render_ready)
+        # The markdown import/setup overlaps with building the widgets below
+        self.render_pool.start(PrewarmTask())
+
+        # Web search in progress: target chat + rendered results that already arrived
+        self.search_chat = None
+        self.search_progress_html = []
+
+        # Chat being named by title_worker
+        self.title_chat = None
+
+        # Widgets that events can reach before (or without) being built:
+        # None until then, so handlers test `is not None` instead of hasattr.
+        # Settings overlay is created on first open.
+        self.chat_view = None
+        self.overlay_buttons = None
+        self._overlay_position_timer = None
+        self.settings_overlay = None
+        # Web search settings, read once and refreshed when settings are saved
+        self.web_settings = load_web_settings()
+        # Web settings snapshot of the current search turn
+        self.search_settings = None
 
         # Default model
         self.default_model_name = load_default_model()
-        if self.default_model_name not in AVAILABLE_MODELS:
-            self.default_model_name = DEFAULT_MODEL_NAME
+        if self.default_model_name not in available_models():
+            self.default_model_name = get_default_model_name()
             save_default_model(self.default_model_name)
 
         # Root splitter
@@ -164,9 +297,6 @@ class HttpLLMChatWindow(QMainWindow):
         self._init_zoom_shortcuts()
         self.apply_ui_scale()
 
-        # Settings overlay
-        self.settings_overlay = SettingsOverlay(self)
-
     # ------------------------------------------------------------------ #
     #  Basic properties / helpers
     # ------------------------------------------------------------------ #
@@ -180,7 +310,7 @@ class HttpLLMChatWindow(QMainWindow):
     @property
     def current_model(self):
         chat = self.current_chat
-        return chat["model"] if chat else DEFAULT_MODEL_NAME
+        return chat["model"] if chat else get_default_model_name()
 
     @current_model.setter
     def current_model(self, value):
@@ -225,12 +355,25 @@ class HttpLLMChatWindow(QMainWindow):
 
         left_layout.addLayout(header_layout)
 
-        # Chat list
-        self.chat_list = QListWidget()
+        # Chat list: a model over self.chats + a painting delegate, so rows cost
+        # no widgets and only visible rows are drawn
+        self.chat_model = ChatListModel(self.chats, self)
+        self.chat_delegate = ChatListDelegate(self)
+        # Queued: the row is removed after the view has finished handling the click
+        self.chat_delegate.delete_requested.connect(self._delete_chat_at, Qt.QueuedConnection)
+
+        self.chat_list = QListView()
         self.chat_list.setObjectName("ChatList")
         self.chat_list.setFrameShape(QFrame.NoFrame)
         self.chat_list.setHorizontalScrollBarPolicy(Qt.ScrollBarAlwaysOff)
-        self.chat_list.currentRowChanged.connect(self.on_chat_selected)
+        self.chat_list.setUniformItemSizes(True)
+        self.chat_list.setMouseTracking(True)
+        self.chat_list.viewport().setAttribute(Qt.WA_Hover, True)
+        self.chat_list.setModel(self.chat_model)
+        self.chat_list.setItemDelegate(self.chat_delegate)
+        self.chat_list.selectionModel().currentRowChanged.connect(
+            lambda current, _previous: self.on_chat_selected(current.row())
+        )
 
         # Context menu
         self.chat_list.setContextMenuPolicy(Qt.CustomContextMenu)
@@ -257,10 +400,10 @@ class HttpLLMChatWindow(QMainWindow):
         top_bar.addWidget(self.label_model)
 
         self.model_combo = QComboBox()
-        if AVAILABLE_MODELS:
-            self.model_combo.addItems(AVAILABLE_MODELS)
+        if available_models():
+            self.model_combo.addItems(available_models())
         else:
-            self.model_combo.addItem(DEFAULT_MODEL_NAME)
+            self.model_combo.addItem(get_default_model_name())
 
         self.model_combo.setCurrentText(self.default_model_name)
         self.model_combo.currentTextChanged.connect(self.on_model_changed)
@@ -285,6 +428,12 @@ class HttpLLMChatWindow(QMainWindow):
         self.chat_view.setAttribute(Qt.WA_StyledBackground, True)
         self.chat_view.setStyleSheet(f"background-color: {bg};")
         self.chat_view.page().setBackgroundColor(QColor(bg))
+
+        self.chat_bridge = ChatBridge(self)
+        self.chat_bridge.ready.connect(self._on_view_ready)
+        self.chat_channel = QWebChannel(self.chat_view.page())
+        self.chat_channel.registerObject("bridge", self.chat_bridge)
+        self.chat_view.page().setWebChannel(self.chat_channel)
         right_layout.addWidget(self.chat_view, 4)
 
         # Input box
@@ -295,7 +444,21 @@ class HttpLLMChatWindow(QMainWindow):
         self.input_max_height = 400
         self.input_box.setFixedHeight(self.input_min_height)
 
-        self.input_box.textChanged.connect(self.adjust_input_height)
+        # Layout passes are coalesced: a burst of keystrokes / resize events
+        # triggers a single recompute, at most once per frame
+        self._input_resize_timer = QTimer(self)
+        self._input_resize_timer.setSingleShot(True)
+        self._input_resize_timer.setInterval(INPUT_RESIZE_MS)
+        self._input_resize_timer.timeout.connect(self.adjust_input_height)
+        # (document revision, viewport width) of the last recompute
+        self._input_height_key = None
+
+        self._overlay_position_timer = QTimer(self)
+        self._overlay_position_timer.setSingleShot(True)
+        self._overlay_position_timer.setInterval(0)
+        self._overlay_position_timer.timeout.connect(self._position_overlay_buttons)
+
+        self.input_box.textChanged.connect(self._input_resize_timer.start)
         self.input_box.installEventFilter(self)
         right_layout.addWidget(self.input_box)
         self.adjust_input_height()
@@ -313,11 +476,7 @@ class HttpLLMChatWindow(QMainWindow):
         self.search_toggle.setObjectName("searchToggle")
         self.search_toggle.setCheckable(True)
 
-        try:
-            ws = load_web_settings()
-            self.search_toggle.setEnabled(bool(ws.get("enabled", True)))
-        except Exception:
-            pass
+        self.search_toggle.setEnabled(bool(self.web_settings.get("enabled", True)))
 
         overlay_layout.addWidget(self.search_toggle)
 
@@ -333,7 +492,7 @@ class HttpLLMChatWindow(QMainWindow):
 
     def _position_overlay_buttons(self):
         """Position overlay buttons at bottom-right of chat_view."""
-        if not hasattr(self, "overlay_buttons") or not hasattr(self, "chat_view"):
+        if self.overlay_buttons is None or self.chat_view is None:
             return
 
         right_panel = self.chat_view.parentWidget()
@@ -364,68 +523,78 @@ class HttpLLMChatWindow(QMainWindow):
         if loaded is not None:
             self.chats, current_idx = loaded
 
-            # Rebuild HTML from history
-            for chat in self.chats:
-                fragments = []
-                for msg in chat.get("history", []):
-                    role = (msg.get("role") or "").lower()
-                    kind = (msg.get("kind") or "").strip()
-                    content = msg.get("content") or ""
-                    if not content:
-                        continue
-
-                    if kind in ("web_links", "web_results"):
-                        fragments.append(renderer.render_web_links_block(content))
-                        continue
-
-                    if role == "system":
-                        frag = renderer.render_system_msg(content)
-                    elif role == "user":
-                        frag = renderer.render_user_msg(content)
-                    elif role == "assistant":
-                        frag = renderer.render_assistant_msg("", content)
-                    else:
-                        continue
-
-                    fragments.append(frag)
-
-                chat["html"] = "".join(fragments)
-
+            # HTML is rendered from history when a chat is first shown
             for chat in self.chats:
-                self._add_chat_list_item(chat.get("title", "Untitled"))
+                chat["html"] = None
 
-            self.chat_list.setCurrentRow(current_idx)
+            self.chat_model.set_chats(self.chats)
+            self._select_chat_row(current_idx)
             return
 
         # First run
         first = chat_state.make_new_chat("Chat 1", self.default_model_name)
-        self.chats.append(first)
-        self._add_chat_list_item(first["title"])
-        self.chat_list.setCurrentRow(0)
-
-        self.append_system(f"Backend: {API_URL}")
-        self.append_system(f"Available models: {', '.join(AVAILABLE_MODELS)}")
-        self.append_system(f"Current model: {self.current_model}")
-        self.append_system(f"MAX_TOKENS={MAX_TOKENS}, N_PREDICT={N_PREDICT}")
-
-    def _add_chat_list_item(self, title: str) -> None:
-        item = QListWidgetItem()
-        widget = ChatListItemWidget(title)
-        widget.delete_clicked.connect(
-            lambda: self._delete_chat_at(self.chat_list.row(item))
-        )
-        self.chat_list.addItem(item)
-        self.chat_list.setItemWidget(item, widget)
-
-        app = QApplication.instance()
-        if app is not None:
-            f = app.font()
-            widget.setFont(f)
-            widget.label.setFont(f)
-            widget.close_button.setFont(f)
+        self.chat_model.append_chat(first)
+        self._select_chat_row(0)
+
+        # Welcome notes go in as one fragment: one page update instead of four
+        self._add_notes(first, (
+            f"Backend: {API_URL}",
+            f"Available models: {', '.join(available_models())}",
+            f"Current model: {self.current_model}",
+            f"MAX_TOKENS={MAX_TOKENS}, N_PREDICT={N_PREDICT}",
+        ))
+
+    def _select_chat_row(self, row: int) -> None:
+        index = self.chat_model.index(row)
+        if index == self.chat_list.currentIndex():
+            # Current row did not move (e.g. rows shifted under it): sync anyway
+            self.on_chat_selected(row)
+        else:
+            self.chat_list.setCurrentIndex(index)
+
+    def _append_history(self, chat, msg) -> None:
+        # $ All history appends go through here so the planner view never drifts
+        chat["history"].append(msg)
+        # Change marker for saving (see chat_state._chat_stamp)
+        chat["rev"] = chat.get("rev", 0) + 1
+        planner = chat.get("planner_history")
+        if planner is not None and _is_planner_msg(msg):
+            planner.append(msg)
+
+    def _planner_history(self, chat):
+        # $ chat["history"] filtered for the search planner; built once, then
+        # extended by _append_history (not saved, rebuilt after a restart)
+        planner = chat.get("planner_history")
+        if planner is None:
+            planner = chat["planner_history"] = [
+                m for m in chat["history"] if _is_planner_msg(m)
+            ]
+        return planner
+
+    def _schedule_save(self) -> None:
+        chat_state.schedule_save(self.chats, self.current_chat_index)
+
+    def _run_net_worker(self, worker):
+        # $ Queue worker.run() on net_thread
+        QMetaObject.invokeMethod(worker, "run", Qt.QueuedConnection)
+
+    def _request_reply(self, chat, cache_key=None):
+        # $ Stream a reply to the chat's history; cache_key: where to keep it (None: not cached)
+        self._reply_key = cache_key
+        self.worker.set_job(chat["history"], chat["model"])
+        self._run_net_worker(self.worker)
 
     def closeEvent(self, event):
-        chat_state.save_chats(self.chats, self.current_chat_index)
+        self._cancel_web_search()
+        # Hidden first: the last write runs after the window is gone from screen
+        self.hide()
+        chat_state.flush_saves(self.chats, self.current_chat_index)
+        # A reply still streaming is stopped; net_thread must have finished before
+        # the window (its parent) is destroyed. A title or search planner request
+        # still running ends within its own timeout.
+        self.worker.cancel()
+        self.net_thread.quit()
+        self.net_thread.wait()
         super().closeEvent(event)
 
     # ------------------------------------------------------------------ #
@@ -465,18 +634,22 @@ class HttpLLMChatWindow(QMainWindow):
 
     def resizeEvent(self, event):
         super().resizeEvent(event)
-        if hasattr(self, "settings_overlay") and self.settings_overlay.isVisible():
-            self.settings_overlay.resize_to_parent()
-        self._position_overlay_buttons()
+        overlay = self.settings_overlay
+        if overlay is not None and overlay.isVisible():
+            overlay.resize_to_parent()
+        if self._overlay_position_timer is not None:
+            self._overlay_position_timer.start()
 
     # ------------------------------------------------------------------ #
     #  Settings / theme
     # ------------------------------------------------------------------ #
 
     def on_settings_button_clicked(self):
-        if not self.settings_overlay:
-            return
-        self.settings_overlay.sync_from_settings()
+        if self.settings_overlay is None:
+            # Pages sync themselves from settings when they are built
+            self.settings_overlay = SettingsOverlay(self)
+        else:
+            self.settings_overlay.sync_from_settings()
         self.settings_overlay.resize_to_parent()
         self.settings_overlay.show()
         self.settings_overlay.raise_()
@@ -488,7 +661,7 @@ class HttpLLMChatWindow(QMainWindow):
 
         # Web view background
         bg = theme.get("bg", "#111111")
-        if hasattr(self, "chat_view"):
+        if self.chat_view is not None:
             self.chat_view.setAttribute(Qt.WA_StyledBackground, True)
             self.chat_view.setStyleSheet(f"background-color: {bg};")
             self.chat_view.page().setBackgroundColor(QColor(bg))
@@ -496,102 +669,48 @@ class HttpLLMChatWindow(QMainWindow):
         # QSS for the whole app
         app = QApplication.instance()
         if app is not None:
-            base_dir = Path(__file__).resolve().parent
-            style_path = base_dir / "ui" / "style.qss"
-            if style_path.exists():
-                raw_qss = style_path.read_text(encoding="utf-8")
-
-                replacements = {
-                    "{{QT_BG}}": theme.get("qt_bg", theme.get("bg", "#111111")),
-                    "{{QT_FG}}": theme.get("qt_fg", theme.get("fg", "#eeeeee")),
-                    "{{QT_ACCENT}}": theme.get("qt_accent", "#4a90e2"),
-                    "{{QT_ACCENT_HOVER}}": theme.get("qt_accent_hover", "#5aa0f2"),
-                    "{{QT_ACCENT_DISABLED}}": theme.get(
-                        "qt_accent_disabled", "#555555"
-                    ),
-                    "{{QT_BORDER}}": theme.get("qt_border", "#333333"),
-                    "{{QT_SIDEBAR_BG}}": theme.get(
-                        "qt_sidebar_bg", "#101010"
-                    ),
-                    "{{QT_SIDEBAR_SELECTED_BG}}": theme.get(
-                        "qt_sidebar_selected_bg", "#262626"
-                    ),
-                    "{{QT_SPLITTER_BG}}": theme.get(
-                        "qt_splitter_bg", "#181818"
-                    ),
-                    "{{QT_INPUT_BG}}": theme.get(
-                        "qt_input_bg", "#121212"
-                    ),
-                    "{{QT_BUTTON_BG}}": theme.get(
-                        "qt_button_bg", "#181818"
-                    ),
-                    "{{QT_BUTTON_HOVER_BG}}": theme.get(
-                        "qt_button_hover_bg", "#222222"
-                    ),
-                    "{{QT_BUTTON_PRESSED_BG}}": theme.get(
-                        "qt_button_pressed_bg", "#262626"
-                    ),
-                    "{{QT_BUTTON_DISABLED_BG}}": theme.get(
-                        "qt_button_disabled_bg", "#141414"
-                    ),
-                    "{{QT_BUTTON_DISABLED_FG}}": theme.get(
-                        "qt_button_disabled_fg", "#555555"
-                    ),
-                    "{{QT_SEARCH_TOGGLE_ON_BG}}": theme.get(
-                        "qt_search_toggle_on_bg", "#2b7a3f"
-                    ),
-                    "{{QT_SEARCH_TOGGLE_ON_HOVER_BG}}": theme.get(
-                        "qt_search_toggle_on_hover_bg", "#33994c"
-                    ),
-                    "{{QT_CHECKBOX_BG}}": theme.get(
-                        "qt_checkbox_bg", "#181818"
-                    ),
-                    "{{QT_CHECKBOX_CHECKED_BG}}": theme.get(
-                        "qt_checkbox_checked_bg", "#2b7a3f"
-                    ),
-                    "{{QT_SCROLLBAR_BG}}": theme.get(
-                        "qt_scrollbar_bg", "#111111"
-                    ),
-                    "{{QT_SCROLLBAR_HANDLE_BG}}": theme.get(
-                        "qt_scrollbar_handle_bg", "#444444"
-                    ),
-                }
-
-                for k, v in replacements.items():
-                    raw_qss = raw_qss.replace(k, v)
+            qss = build_stylesheet(theme)
+            if qss is not None:
+                app.setStyleSheet(qss)
 
-                app.setStyleSheet(raw_qss)
-
-        if hasattr(self, "_refresh_view"):
-            self._refresh_view()
+        if self.chat_view is not None:
+            self._reload_view()
 
     def on_settings_updated(self):
         """Called by SettingsOverlay after Save."""
         self.default_model_name = load_default_model()
+        self.web_settings = load_web_settings()
+        self.search_toggle.setEnabled(bool(self.web_settings.get("enabled", True)))
 
-        if hasattr(self, "model_combo"):
+        def sync():
             idx = self.model_combo.findText(self.default_model_name)
             if idx >= 0:
-                self.model_combo.blockSignals(True)
                 self.model_combo.setCurrentIndex(idx)
-                self.model_combo.blockSignals(False)
-
-        if hasattr(self, "default_checkbox"):
             current = self.model_combo.currentText().strip()
-            self.default_checkbox.blockSignals(True)
             self.default_checkbox.setChecked(current == self.default_model_name)
-            self.default_checkbox.blockSignals(False)
 
+        self._sync_model_widgets(sync)
         self.reload_theme()
 
+    def _sync_model_widgets(self, fn) -> None:
+        """Call fn with the top bar's repaints off and the model widgets' signals blocked."""
+        bar = self.model_combo.parentWidget()
+        widgets = (self.model_combo, self.default_checkbox)
+        bar.setUpdatesEnabled(False)
+        was_blocked = [w.blockSignals(True) for w in widgets]
+        try:
+            fn()
+        finally:
+            for w, blocked in zip(widgets, was_blocked):
+                w.blockSignals(blocked)
+            # Re-enabling schedules a single repaint of the bar
+            bar.setUpdatesEnabled(True)
+
     # ------------------------------------------------------------------ #
     #  Sidebar collapse
     # ------------------------------------------------------------------ #
 
     def toggle_sidebar(self):
-        if not hasattr(self, "splitter"):
-            return
-
         sizes = self.splitter.sizes()
         total = sum(sizes) or self.width() or 1
 
@@ -620,39 +739,32 @@ class HttpLLMChatWindow(QMainWindow):
         self.current_chat_index = index
         chat = self.chats[index]
 
-        # Sync model combo
-        self.model_combo.blockSignals(True)
-        self.model_combo.setCurrentText(chat["model"])
-        self.model_combo.blockSignals(False)
-
-        # Sync default checkbox
-        if hasattr(self, "default_checkbox"):
-            self.default_checkbox.blockSignals(True)
-            self.default_checkbox.setChecked(
-                chat["model"].strip() == self.default_model_name
-            )
-            self.default_checkbox.blockSignals(False)
+        # Sync model combo + default checkbox
+        def sync():
+            self.model_combo.setCurrentText(chat["model"])
+            self.default_checkbox.setChecked(chat["model"].strip() == self.default_model_name)
 
+        self._sync_model_widgets(sync)
         self._refresh_view()
 
     def on_new_chat_clicked(self):
         title = f"Chat {len(self.chats) + 1}"
         chat = chat_state.make_new_chat(title, self.default_model_name)
-        self.chats.append(chat)
-        self._add_chat_list_item(title)
-        self.chat_list.setCurrentRow(len(self.chats) - 1)
+        self.chat_model.append_chat(chat)
+        self._select_chat_row(len(self.chats) - 1)
+        self._schedule_save()
 
     def on_delete_chat_clicked(self):
         if not self.chats:
             return
-        self._delete_chat_at(self.chat_list.currentRow())
+        self._delete_chat_at(self.chat_list.currentIndex().row())
 
     def on_chat_context_menu(self, pos):
-        item = self.chat_list.itemAt(pos)
-        if item is None:
+        index = self.chat_list.indexAt(pos)
+        if not index.isValid():
             return
 
-        row = self.chat_list.row(item)
+        row = index.row()
 
         menu = QMenu(self)
         rename_action = menu.addAction("Rename chat")
@@ -671,18 +783,28 @@ class HttpLLMChatWindow(QMainWindow):
         if row < 0 or row >= len(self.chats):
             return
 
-        self.chats.pop(row)
-        self.chat_list.takeItem(row)
+        if self.chats[row] is self.search_chat:
+            self._cancel_web_search()
+
+        # The selection model moves the current row off a removed one before the
+        # list changes; that intermediate pick is skipped, the new row is set below
+        selection = self.chat_list.selectionModel()
+        selection.blockSignals(True)
+        try:
+            removed = self.chat_model.remove_chat(row)
+            self._html_chats.pop(id(removed), None)
+        finally:
+            selection.blockSignals(False)
 
         if not self.chats:
             new_chat = chat_state.make_new_chat("Chat 1", self.default_model_name)
-            self.chats.append(new_chat)
-            self._add_chat_list_item(new_chat["title"])
-            self.chat_list.setCurrentRow(0)
-            return
+            self.chat_model.append_chat(new_chat)
+            self._select_chat_row(0)
+        else:
+            new_row = min(row, len(self.chats) - 1)
+            self._select_chat_row(new_row)
 
-        new_row = min(row, len(self.chats) - 1)
-        self.chat_list.setCurrentRow(new_row)
+        self._schedule_save()
 
     def _rename_chat_at(self, row: int):
         if row < 0 or row >= len(self.chats):
@@ -705,53 +827,198 @@ class HttpLLMChatWindow(QMainWindow):
             return
 
         chat["title"] = new_title
-        item = self.chat_list.item(row)
-        if item is not None:
-            widget = self.chat_list.itemWidget(item)
-            if isinstance(widget, ChatListItemWidget):
-                widget.set_title(new_title)
-            else:
-                item.setText(new_title)
+        self.chat_model.title_changed(row)
+
+        self._schedule_save()
 
     # ------------------------------------------------------------------ #
     #  Markdown / HTML helpers
     # ------------------------------------------------------------------ #
 
+    def _view_html(self, chat) -> str:
+        # $ Chat content as currently shown, in-progress blocks included
+        chat_html = self._chat_html(chat)
+        if chat is self.search_chat and self.search_progress_html:
+            chat_html += renderer.render_search_progress("".join(self.search_progress_html))
+        if chat is self.stream_chat:
+            self._render_stream_tail()
+            chat_html += renderer.render_streaming_msg(
+                "".join(self.stream_html_parts), self.stream_tail_html
+            )
+            self._stream_shown = True
+        return chat_html
+
+    def _chat_html(self, chat) -> str:
+        # $ Rendered messages of a chat: from the cache, else rebuilt from history.
+        # Marks it most recently shown and drops the HTML of the oldest beyond the limit.
+        parts = chat.get("html")
+        if parts is None:
+            parts = chat["html"] = [renderer.render_chat(chat.get("history", []))]
+        elif len(parts) > 1:
+            # Fragments appended since the last join become one string again
+            parts[:] = ["".join(parts)]
+        html = parts[0] if parts else ""
+
+        cached = self._html_chats
+        cached[id(chat)] = chat
+        cached.move_to_end(id(chat))
+        while len(cached) > HTML_CACHE_SIZE:
+            _, old = cached.popitem(last=False)
+            old["html"] = None
+        return html
+
     def _refresh_view(self):
+        # $ Show the current chat (chat switch): only #chat is replaced once the page is up
         chat = self.current_chat
         if not chat:
-            self.chat_view.setHtml("<html><body></body></html>")
+            self._reload_view()
+            return
+        if not self._page_ready:
+            self._reload_view()
             return
+        if chat is self._shown_chat:
+            # Already on the page, kept current by the incremental updates
+            return
+        self._shown_chat = chat
+        self.chat_bridge.reset_chat.emit(self._view_html(chat))
+
+    def _reload_view(self):
+        # $ Full rebuild of the page (first load, theme change); appends use _append_html
+        self._page_ready = False
+        self._pending_view_updates = []
+
+        chat = self.current_chat
+        self._shown_chat = chat
+        self.chat_view.setHtml(renderer.wrap_page(self._view_html(chat) if chat else ""))
+
+    def _on_view_ready(self):
+        self._page_ready = True
+        pending, self._pending_view_updates = self._pending_view_updates, []
+        for signal, args in pending:
+            signal.emit(*args)
+        self.chat_bridge.scroll_to_bottom.emit()
+
+    def _view_update(self, signal, *args):
+        # $ Emit a bridge signal now, or right after the page that is loading has connected
+        if self._page_ready:
+            signal.emit(*args)
+        else:
+            self._pending_view_updates.append((signal, args))
 
-        full_html = renderer.wrap_page(chat["html"])
-        self.chat_view.setHtml(full_html)
-        QTimer.singleShot(50, self._scroll_to_bottom)
+    def _run_view_step(self, step):
+        # $ Apply now, or after the replies still rendering ahead of it (keeps chat order)
+        if self._view_steps:
+            self._view_steps.append([step])
+        else:
+            step()
+
+    def _on_render_ready(self, slot, html: str):
+        # $ slot is [None, chat] from append_assistant
+        chat = slot[1]
+        slot[0] = lambda: self._insert_message(chat, html)
+        steps = self._view_steps
+        while steps and steps[0][0] is not None:
+            steps.popleft()[0]()
+
+    def _append_html(self, chat, fragment: str):
+        self._run_view_step(lambda: self._insert_message(chat, fragment))
+
+    def _insert_message(self, chat, fragment: str):
+        # $ Add a rendered message: stored for switching/reloads, inserted into the
+        # live page without re-parsing it. Goes above any in-progress block.
+        parts = chat.get("html")
+        if parts is None:
+            # Not in memory: the message is in history and shows up when rendered
+            return
+        # Joined lazily in _chat_html, so an append does not copy the whole chat
+        parts.append(fragment)
+        if chat is not self.current_chat:
+            return
+        self._view_update(self.chat_bridge.append_html, fragment)
 
-    def _scroll_to_bottom(self):
-        self.chat_view.page().runJavaScript(
-            "window.scrollTo(0, document.body.scrollHeight);"
+    def _insert_view_block(self, element_id: str, block_html: str):
+        # $ Append a temporary block (streaming reply, search progress) unless present
+        self._view_update(self.chat_bridge.insert_block, element_id, block_html)
+
+    def _remove_view_element(self, element_id: str):
+        # $ Ordered with appends: a placeholder stays until the message before it is in
+        self._run_view_step(
+            lambda: self._view_update(self.chat_bridge.remove_element, element_id)
         )
 
-    def append_system(self, content: str):
-        chat = self.current_chat
+    def _begin_stream(self, chat):
+        # $ Show an empty placeholder for the reply (also on later refreshes of this chat)
+        self.stream_chat = chat
+        self.stream_html_parts = []
+        self.stream_tail = ""
+        self.stream_tail_html = ""
+        self._stream_shown = False
+        if chat is self.current_chat:
+            # Ordered with appends: the previous reply's placeholder may still be
+            # waiting for its removal behind a reply that is rendering
+            self._run_view_step(self._show_stream_block)
+
+    def _show_stream_block(self):
+        # $ Insert the placeholder with everything streamed so far; from then on
+        # _flush_stream pushes the changes
+        if self.stream_chat is None or self.stream_chat is not self.current_chat:
+            return
+        self._render_stream_tail()
+        self._insert_view_block(
+            "msg-streaming",
+            renderer.render_streaming_msg("".join(self.stream_html_parts), self.stream_tail_html),
+        )
+        self._stream_shown = True
+
+    def _end_stream(self):
+        self._stream_flush_timer.stop()
+        if self.stream_chat is not None and self.stream_chat is self.current_chat:
+            self._remove_view_element("msg-streaming")
+        self.stream_chat = None
+        self.stream_html_parts = []
+        self.stream_tail = ""
+        self.stream_tail_html = ""
+        self._stream_shown = False
+
+    def _add_notes(self, chat, lines):
+        # $ App notes (errors, model switches, ...): kept in the history as "note"
+        # entries so a chat rebuilt from history still shows them (never sent to
+        # the model), and shown as one fragment
+        fragments = []
+        for line in lines:
+            self._append_history(chat, {"role": "system", "content": line, "kind": "note"})
+            fragments.append(renderer.render_system_msg(line))
+        self._append_html(chat, "".join(fragments))
+        self._schedule_save()
+
+    def append_system(self, content: str, chat=None):
+        # $ append_*: chat is the one to add to (default: the current one), e.g. the
+        # one a reply or search was started from, which need not be shown any more.
+        # System lines are app notes, see _add_notes.
+        chat = chat if chat is not None else self.current_chat
         if not chat:
             return
-        chat["html"] += renderer.render_system_msg(content)
-        self._refresh_view()
+        self._add_notes(chat, (content,))
 
-    def append_user(self, content: str):
-        chat = self.current_chat
+    def append_user(self, content: str, chat=None):
+        chat = chat if chat is not None else self.current_chat
         if not chat:
             return
-        chat["html"] += renderer.render_user_msg(content)
-        self._refresh_view()
+        self._append_html(chat, renderer.render_user_msg(content))
 
-    def append_assistant(self, reasoning: str, answer: str):
-        chat = self.current_chat
+    def append_assistant(self, reasoning: str, answer: str, chat=None):
+        chat = chat if chat is not None else self.current_chat
         if not chat:
             return
-        chat["html"] += renderer.render_assistant_msg(reasoning, answer)
-        self._refresh_view()
+        if len(answer) < ASYNC_RENDER_CHARS and "```" not in answer:
+            self._append_html(chat, renderer.render_assistant_msg(reasoning, answer))
+            return
+
+        # Large / code-heavy reply: markdown is rendered off the UI thread and the
+        # message inserted once ready; later changes queue behind it
+        slot = [None, chat]
+        self._view_steps.append(slot)
+        self.render_pool.start(RenderTask(slot, reasoning, answer, self.render_signals))
 
     # ------------------------------------------------------------------ #
     #  Model switching / default model
@@ -774,6 +1041,8 @@ class HttpLLMChatWindow(QMainWindow):
         else:
             self.append_system(f"Switched model to: {chat['model']}")
 
+        self._schedule_save()
+
     def on_default_model_toggled(self, checked: bool):
         if not checked:
             return
@@ -789,23 +1058,28 @@ class HttpLLMChatWindow(QMainWindow):
     #  LLM busy bookkeeping / title planner
     # ------------------------------------------------------------------ #
 
+    def _begin_llm_cycle(self):
+        """Called before the first job of a turn is queued; refuses sends until finished."""
+        self.llm_busy = True
+        self.send_button.setEnabled(False)
+        self.send_button.setText("...")
+
     def _finish_llm_cycle(self):
         """Called when all LLM-related work for this turn is done."""
         self.llm_busy = False
         self.send_button.setEnabled(True)
         self.send_button.setText("Send")
 
-    def _start_title_planner_if_needed(self):
-        """Optionally start TitleWorker. Otherwise, end cycle."""
+    def _start_title_planner_if_needed(self, chat):
+        """Optionally start TitleWorker for the chat that was just answered. Otherwise, end cycle."""
         if not is_title_planner_enabled():
             self._finish_llm_cycle()
             return
 
-        if not (0 <= self.current_chat_index < len(self.chats)):
+        if chat is None:
             self._finish_llm_cycle()
             return
 
-        chat = self.chats[self.current_chat_index]
         title = (chat.get("title") or "").strip()
 
         # Only auto-name generic "Chat N"
@@ -820,39 +1094,26 @@ class HttpLLMChatWindow(QMainWindow):
 
         model_name = chat.get("model") or self.default_model_name
 
-        self.title_thread = QThread()
-        self.title_worker = TitleWorker(history.copy(), model_name)
-        self.title_worker.moveToThread(self.title_thread)
-
-        self.title_thread.started.connect(self.title_worker.run)
-        self.title_worker.finished.connect(self.on_title_ready)
-        self.title_worker.error.connect(self.on_title_error)
-        self.title_worker.finished.connect(self.title_thread.quit)
-        self.title_worker.error.connect(self.title_thread.quit)
-        self.title_worker.finished.connect(self.title_worker.deleteLater)
-        self.title_thread.finished.connect(self.title_thread.deleteLater)
-
-        self.title_thread.start()
+        self.title_chat = chat
+        self.title_worker.set_job(history, model_name)
+        self._run_net_worker(self.title_worker)
 
     def on_title_ready(self, new_title: str):
         new_title = (new_title or "").strip()
 
-        chat = self.current_chat
-        if chat and new_title:
+        # The chat that was named, even if another one was selected meanwhile
+        chat, self.title_chat = self.title_chat, None
+        row = self.chat_model.row_of(chat) if chat is not None else -1
+        if row >= 0 and new_title:
             chat["title"] = new_title
-            row = self.current_chat_index
-            item = self.chat_list.item(row)
-            if item is not None:
-                widget = self.chat_list.itemWidget(item)
-                if isinstance(widget, ChatListItemWidget):
-                    widget.set_title(new_title)
-                else:
-                    item.setText(new_title)
+            self.chat_model.title_changed(row)
+            self._schedule_save()
 
         self._finish_llm_cycle()
 
     def on_title_error(self, message: str):
         print(f"[title_planner] ERROR in TitleWorker: {message}")
+        self.title_chat = None
         self._finish_llm_cycle()
 
     # ------------------------------------------------------------------ #
@@ -863,7 +1124,7 @@ class HttpLLMChatWindow(QMainWindow):
         chat = self.current_chat
         if not chat or not self.send_button.isEnabled():
             return
-        if getattr(self, "llm_busy", False):
+        if self.llm_busy:
             return
 
         text = self.input_box.toPlainText().strip()
@@ -871,36 +1132,45 @@ class HttpLLMChatWindow(QMainWindow):
             return
 
         if self.search_toggle.isChecked():
-            self.on_search_web_clicked()
+            self._start_web_search(chat, text)
             return
 
         self.input_box.clear()
+        self._begin_stream(chat)
         self.append_user(text)
-        chat["history"].append({"role": "user", "content": text})
+        self._append_history(chat, {"role": "user", "content": text})
+        # Persisted right away (debounced), so a crash mid-reply keeps the question
+        self._schedule_save()
 
-        self.llm_busy = True
-        self.send_button.setEnabled(False)
-        self.send_button.setText("...")
-        QApplication.processEvents()
-
-        self.thread = QThread()
-        self.worker = Worker(chat["history"].copy(), chat["model"])
-        self.worker.moveToThread(self.thread)
+        self._begin_llm_cycle()
 
-        self.thread.started.connect(self.worker.run)
-        self.worker.finished.connect(self.on_reply_ready)
-        self.worker.error.connect(self.on_reply_error)
-        self.worker.finished.connect(self.thread.quit)
-        self.worker.error.connect(self.thread.quit)
-        self.worker.finished.connect(self.worker.deleteLater)
-        self.thread.finished.connect(self.thread.deleteLater)
+        key = None
+        if is_reply_cache_enabled():
+            key = _reply_cache_key(chat["model"], chat["history"])
+            cached = self._reply_cache.get(key)
+            if cached is not None:
+                # Same model + history as an earlier reply: no request at all
+                self._reply_cache.move_to_end(key)
+                self._reply_key = key
+                QTimer.singleShot(0, lambda: self.on_reply_ready(*cached))
+                return
 
-        self.thread.start()
+        self._request_reply(chat, key)
 
     def adjust_input_height(self):
         """Auto-resize input box height within min/max."""
         doc = self.input_box.document()
-        doc.setTextWidth(self.input_box.viewport().width())
+        width = self.input_box.viewport().width()
+        key = (doc.revision(), width)
+        if key == self._input_height_key:
+            return
+        self._input_height_key = key
+
+        if doc.isEmpty():
+            self.input_box.setFixedHeight(self.input_min_height)
+            return
+
+        doc.setTextWidth(width)
 
         layout = doc.documentLayout()
         if layout is None:
@@ -920,134 +1190,195 @@ class HttpLLMChatWindow(QMainWindow):
     #  LLM-based web search flow
     # ------------------------------------------------------------------ #
 
-    def on_search_web_clicked(self):
-        chat = self.current_chat
-        if not chat or not self.send_button.isEnabled():
-            return
-        if getattr(self, "llm_busy", False):
-            return
-
-        raw_message = self.input_box.toPlainText().strip()
-        if not raw_message:
-            return
+    def _start_web_search(self, chat, raw_message: str):
+        # $ Send path with the search toggle on; on_send_clicked has done the checks
+        # and read the input box (read once: a large paste is not copied out twice)
 
         # 1) Append user message
         self.input_box.clear()
         self.append_user(raw_message)
-        chat["history"].append({"role": "user", "content": raw_message})
-
-        # 2) Build planner_history for search planner
-        planner_history = []
-        for msg in chat["history"]:
-            role = (msg.get("role") or "").lower()
-            kind = msg.get("kind") or ""
-            if role not in ("user", "assistant"):
-                continue
-            if role == "assistant" and kind == "web_results":
-                continue
-            planner_history.append(msg)
+        self._append_history(chat, {"role": "user", "content": raw_message})
+        self._schedule_save()
+
+        # 2) planner_history for search planner (shared, not copied: nothing is
+        # appended to it until the search has finished)
+        planner_history = self._planner_history(chat)
 
         # 3) Start WebSearchWorker
-        self.llm_busy = True
-        self.send_button.setEnabled(False)
-        self.send_button.setText("...")
-        QApplication.processEvents()
+        self._begin_llm_cycle()
 
-        self.search_thread = QThread()
-        self.search_worker = WebSearchWorker(
+        # One settings snapshot for the whole search turn (worker + follow-up);
+        # web_settings is replaced, never changed in place, on a settings save
+        self.search_settings = self.web_settings
+
+        self.search_worker.set_job(
             planner_history=planner_history,
             raw_message=raw_message,
             model_name=chat["model"],
+            web_settings=self.search_settings,
         )
-        self.search_worker.moveToThread(self.search_thread)
 
-        self.search_thread.started.connect(self.search_worker.run)
-        self.search_worker.finished.connect(self.on_web_search_finished)
-        self.search_worker.error.connect(self.on_web_search_error)
-        self.search_worker.finished.connect(self.search_thread.quit)
-        self.search_worker.error.connect(self.search_thread.quit)
-        self.search_worker.finished.connect(self.search_worker.deleteLater)
-        self.search_thread.finished.connect(self.search_thread.deleteLater)
+        self.search_chat = chat
+        self.search_progress_html = []
 
-        self.search_thread.start()
+        self._run_net_worker(self.search_worker)
 
-    def on_web_search_finished(self, raw_message, search_query, md_block, context_blocks):
-        chat = self.current_chat
-        if not chat:
+    def on_web_search_progress(self, index: int, item_html: str):
+        # $ Show each result as its page arrives; the final block replaces these
+        self.search_progress_html.append(item_html)
+
+        if self.current_chat is not self.search_chat:
+            return
+        if len(self.search_progress_html) == 1:
+            # First result: the container does not exist yet
+            self._insert_view_block(
+                "search-progress", renderer.render_search_progress(item_html)
+            )
+            return
+        self._view_update(self.chat_bridge.append_into, "search-progress-items", item_html)
+
+    def _end_search_progress(self):
+        if self.search_chat is not None and self.search_chat is self.current_chat:
+            self._remove_view_element("search-progress")
+        self.search_chat = None
+        self.search_progress_html = []
+
+    def on_web_search_finished(
+        self, raw_message, search_query, links_html, search_context, has_page_text
+    ):
+        # The chat the search was started from, even if another one is shown now
+        chat = self.search_chat
+        self._end_search_progress()
+        if chat is None or self.chat_model.row_of(chat) < 0:
             self._finish_llm_cycle()
             return
 
-        ws = load_web_settings()
+        ws = self.search_settings or self.web_settings
 
         if ws.get("show_query", True):
-            self.append_system(f"[web search query] {search_query}")
+            self.append_system(f"[web search query] {search_query}", chat)
 
-        frag = renderer.render_web_links_block(md_block or "_no results_")
-        chat["html"] += frag
-        self._refresh_view()
+        self._append_html(chat, links_html)
 
-        if context_blocks:
-            text_block = "\n\n\n".join(context_blocks)
-        else:
-            text_block = "No usable page content found."
+        strict = ws.get("strict_web_only", True)
+        if strict and not has_page_text:
+            # Titles and snippets alone: the model could only say it does not know,
+            # so no request is made. The sources block is kept as a note (there is
+            # no web_results entry to rebuild it from).
+            self._append_history(
+                chat, {"role": "system", "content": links_html, "kind": "web_sources"}
+            )
+            self.append_system(
+                "No usable web content was found, so no answer was generated. "
+                "Turn off web search to ask without web results.",
+                chat,
+            )
+            self._finish_llm_cycle()
+            return
 
-        search_context = (
-            "Web search results and page content.\n"
-            f"Original user message: {raw_message}\n"
-            f"Search query used: {search_query}\n\n"
-            f"{text_block}"
-        )
+        self._begin_stream(chat)
 
-        chat["history"].append(
+        self._append_history(
+            chat,
             {
                 "role": "assistant",
                 "content": search_context,
                 "kind": "web_results",
-            }
+            },
         )
 
-        if ws.get("strict_web_only", True):
-            chat["history"].append(
+        if strict:
+            self._append_history(
+                chat,
                 {
                     "role": "system",
                     "content": get_web_followup_instruction(),
                 }
             )
 
-        self.thread = QThread()
-        self.worker = Worker(chat["history"], chat["model"])
-        self.worker.moveToThread(self.thread)
+        self._request_reply(chat)
 
-        self.thread.started.connect(self.worker.run)
-        self.worker.finished.connect(self.on_reply_ready)
-        self.worker.error.connect(self.on_reply_error)
-        self.worker.finished.connect(self.thread.quit)
-        self.worker.finished.connect(self.worker.deleteLater)
-        self.thread.finished.connect(self.thread.deleteLater)
+    def _cancel_web_search(self):
+        # $ Stop a running search (its chat is gone or the app is closing)
+        if self.search_chat is None:
+            return
+        self.search_worker.cancel()
 
-        self.thread.start()
+    def on_web_search_cancelled(self):
+        self._end_search_progress()
+        self._finish_llm_cycle()
 
     def on_web_search_error(self, message: str):
-        self.append_system(f"Web search error: {message}")
+        chat = self.search_chat
+        self._end_search_progress()
+        if chat is not None and self.chat_model.row_of(chat) >= 0:
+            self.append_system(f"Web search error: {message}", chat)
         self._finish_llm_cycle()
 
     # ------------------------------------------------------------------ #
     #  Worker callbacks
     # ------------------------------------------------------------------ #
 
+    def on_reply_token(self, piece: str):
+        # $ Collected only; _flush_stream renders and shows the burst once per frame
+        self.stream_tail += piece
+        if not self._stream_flush_timer.isActive():
+            self._stream_flush_timer.start()
+
+    def _render_stream_tail(self) -> str:
+        # $ Only the changing tail is re-rendered; finished blocks are rendered once,
+        # kept in stream_html_parts and returned
+        stable_html, self.stream_tail, self.stream_tail_html = (
+            renderer.render_assistant_msg_incremental(self.stream_tail)
+        )
+        if stable_html:
+            self.stream_html_parts.append(stable_html)
+        return stable_html
+
+    def _flush_stream(self):
+        if self.stream_chat is None:
+            return
+        stable_html = self._render_stream_tail()
+        if self.current_chat is not self.stream_chat or not self._stream_shown:
+            # Not on the page (yet): the placeholder is built from the full state
+            return
+        self._view_update(self.chat_bridge.stream_update, stable_html, self.stream_tail_html)
+
     def on_reply_ready(self, reasoning: str, content: str):
-        chat = self.current_chat
-        if chat:
-            full = (content or reasoning or "").strip()
+        key, self._reply_key = self._reply_key, None
+
+        # The chat the reply was streamed into, even if another one is shown now;
+        # dropped if that chat was deleted meanwhile
+        chat = self.stream_chat
+        if chat is not None and self.chat_model.row_of(chat) < 0:
+            chat = None
+
+        if chat is not None:
+            if key is not None and (content or reasoning):
+                self._reply_cache[key] = (reasoning, content)
+                self._reply_cache.move_to_end(key)
+                if len(self._reply_cache) > REPLY_CACHE_SIZE:
+                    self._reply_cache.popitem(last=False)
+
+            # Worker emits both already stripped; no second copy of a long reply
+            full = content if content else reasoning
             if full:
-                chat["history"].append({"role": "assistant", "content": full})
-                self.append_assistant("", full)
+                self._append_history(chat, {"role": "assistant", "content": full})
+                self.append_assistant("", full, chat)
+            self._schedule_save()
+        # After the append: the placeholder goes once the message is in
+        self._end_stream()
 
         # Last step: title planner
-        self._start_title_planner_if_needed()
+        self._start_title_planner_if_needed(chat)
 
     def on_reply_error(self, message: str):
-        self.append_system(f"ERROR: {message}")
+        self._reply_key = None
+        chat = self.stream_chat
+        self._end_stream()
+        if chat is not None and self.chat_model.row_of(chat) >= 0:
+            self.append_system(f"ERROR: {message}", chat)
+        self._schedule_save()
         self._finish_llm_cycle()
 
     # ------------------------------------------------------------------ #
@@ -1055,42 +1386,44 @@ class HttpLLMChatWindow(QMainWindow):
     # ------------------------------------------------------------------ #
 
     def apply_ui_scale(self):
-        self.ui_scale = max(0.7, min(self.ui_scale, 1.8))
+        # Snapped to UI_SCALE_STEP: repeated zoom in/out lands on the same values
+        # instead of drifting by float error (each distinct value relayouts the page)
+        scale = max(0.7, min(self.ui_scale, 1.8))
+        self.ui_scale = round(scale / UI_SCALE_STEP) * UI_SCALE_STEP
+        # Zoom held at a limit (or reset at the default) changes nothing
+        if self.ui_scale == self._applied_ui_scale:
+            return
 
         app = QApplication.instance()
         if app is None:
             return
+        self._applied_ui_scale = self.ui_scale
 
         base_font = app.font()
         f = QFont(base_font)
         f.setPointSizeF(self.base_font_size * self.ui_scale)
 
+        # One relayout + repaint for all the font changes below
+        self.setUpdatesEnabled(False)
         app.setFont(f)
 
-        for w in [
-            getattr(self, "chat_list", None),
-            getattr(self, "input_box", None),
-            getattr(self, "send_button", None),
-            getattr(self, "search_toggle", None),
-            getattr(self, "model_combo", None),
-            getattr(self, "default_checkbox", None),
-            getattr(self, "new_chat_button", None),
-            getattr(self, "label_chats", None),
-            getattr(self, "label_model", None),
-        ]:
-            if w is not None:
-                w.setFont(f)
-
-        if getattr(self, "chat_list", None) is not None:
-            for i in range(self.chat_list.count()):
-                item = self.chat_list.item(i)
-                widget = self.chat_list.itemWidget(item)
-                if isinstance(widget, ChatListItemWidget):
-                    widget.setFont(f)
-                    widget.label.setFont(f)
-                    widget.close_button.setFont(f)
-
-        if hasattr(self, "chat_view"):
+        # Only called once the widgets are built
+        for w in (
+            self.chat_list,
+            self.input_box,
+            self.send_button,
+            self.search_toggle,
+            self.model_combo,
+            self.default_checkbox,
+            self.new_chat_button,
+            self.label_chats,
+            self.label_model,
+        ):
+            w.setFont(f)
+        self.setUpdatesEnabled(True)
+
+        # Re-zooming the web view relayouts the whole chat; skip it when already there
+        if abs(self.chat_view.zoomFactor() - self.ui_scale) > 1e-3:
             self.chat_view.setZoomFactor(self.ui_scale)
 
     def change_ui_scale(self, factor: float):